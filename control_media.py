@@ -215,19 +215,34 @@ def refresh():
         print(f"[SPOTIFY] Could not refresh token ({response.status_code}): {response.text}")
         return False
 
+# In-memory copy of tokens.json, re-read only when the file's mtime changes
+_TOKENS = {}
+_tokens_mtime = None
+
 def load_tokens():
+    global _TOKENS, _tokens_mtime
     if not os.path.exists("tokens.json"):
         print("Error: No token.json file found")
         maybe_auth()
-    with open("tokens.json", "r") as f:
-        return json.load(f)
+    mtime = os.stat("tokens.json").st_mtime_ns
+    if mtime != _tokens_mtime:
+        with open("tokens.json", "r") as f:
+            _TOKENS = json.load(f)
+        _tokens_mtime = mtime
+    return dict(_TOKENS)
     
 def save_tokens(tokens):
+    global _TOKENS, _tokens_mtime
     tokens_to_save = dict(tokens)
     if "obtained_at" not in tokens_to_save:
         tokens_to_save["obtained_at"] = int(time.time())
-    with open("tokens.json", "w") as f:
+    # Write to a temp file and rename so readers never see a half-written file
+    tmp = "tokens.json.tmp"
+    with open(tmp, "w") as f:
         json.dump(tokens_to_save, f, indent=3)
+    os.replace(tmp, "tokens.json")
+    _TOKENS = tokens_to_save
+    _tokens_mtime = os.stat("tokens.json").st_mtime_ns
 
 # Mainly trying to get the player info in a json format
 def getPlayerInfo():
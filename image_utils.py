@@ -4,9 +4,21 @@ Image utilities for downloading and converting artwork to RGB565 for ESP32 displ
 
 import io
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from PIL import Image
 
+# NumPy vectorizes the RGB565 packing (falls back to a per-pixel loop without it)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 # Enable AVIF support (YouTube often serves AVIF thumbnails)
 try:
     import pillow_avif
@@ -17,10 +29,42 @@ except ImportError:
 TARGET_WIDTH = 80
 TARGET_HEIGHT = 80
 
-# Cache to avoid re-downloading the same image
-_last_url = None
-_last_rgb565 = None
-_last_png_b64 = None
+# Pooled session so consecutive artwork fetches from the same CDN skip the TCP+TLS handshake
+_http = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+)
+_http.mount("https://", _http_adapter)
+_http.mount("http://", _http_adapter)
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+# Small LRU caches: by URL to skip the download, and by image content so the same
+# artwork under a different (e.g. re-signed CDN) URL skips the decode + RGB565 conversion
+_CACHE_SIZE = 16
+_url_cache = OrderedDict()      # (kind, url) -> result
+_content_cache = OrderedDict()  # (kind, sha1 of the downloaded bytes) -> result
+_cache_lock = threading.Lock()
+
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _content_key(kind: str, content: bytes):
+    return (kind, hashlib.sha1(content).digest())
 
 
 def url_to_rgb565(url: str) -> bytes:
@@ -28,16 +72,22 @@ def url_to_rgb565(url: str) -> bytes:
     Download image from URL, resize to 80x80, convert to RGB565 bytes.
     Returns raw RGB565 bytes (12800 bytes for 80x80).
     """
-    global _last_url, _last_rgb565
-    
-    # Return cached if same URL
-    if url == _last_url and _last_rgb565 is not None:
-        return _last_rgb565
+    # Return cached if this URL was converted recently
+    cached = _cache_get(_url_cache, ("rgb565", url))
+    if cached is not None:
+        return cached
     
     try:
         # Download image
-        resp = requests.get(url, timeout=5)
+        resp = _http.get(url, timeout=HTTP_TIMEOUT)
         resp.raise_for_status()
+
+        # Same bytes seen under another URL - reuse that conversion
+        content_key = _content_key("rgb565", resp.content)
+        cached = _cache_get(_content_cache, content_key)
+        if cached is not None:
+            _cache_put(_url_cache, ("rgb565", url), cached)
+            return cached
         
         # Open with PIL
         img = Image.open(io.BytesIO(resp.content))
@@ -53,8 +103,8 @@ def url_to_rgb565(url: str) -> bytes:
         rgb565_data = rgb_to_rgb565(img)
         
         # Cache it
-        _last_url = url
-        _last_rgb565 = rgb565_data
+        _cache_put(_url_cache, ("rgb565", url), rgb565_data)
+        _cache_put(_content_cache, content_key, rgb565_data)
         
         return rgb565_data
         
@@ -68,8 +118,6 @@ def get_artwork_png_b64(artwork_url: str) -> str:
     Download artwork, resize to 80x80, convert to RGB565, and return as base64 string.
     RGB565 is used because LVGL on ESP32 can display it directly without a PNG decoder.
     """
-    global _last_url, _last_png_b64
-    
     if not artwork_url:
         return None
     
@@ -80,9 +128,10 @@ def get_artwork_png_b64(artwork_url: str) -> str:
     if not artwork_url or not artwork_url.startswith('http'):
         return None
     
-    # Return cached if same URL
-    if artwork_url == _last_url and _last_png_b64 is not None:
-        return _last_png_b64
+    # Return cached if this URL was converted recently
+    cached = _cache_get(_url_cache, ("b64", artwork_url))
+    if cached is not None:
+        return cached
     
     try:
         # For YouTube thumbnails, try to get a guaranteed JPEG URL
@@ -104,7 +153,7 @@ def get_artwork_png_b64(artwork_url: str) -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'image/jpeg,image/png,image/webp,image/*;q=0.8',
         }
-        resp = requests.get(url_to_fetch, timeout=5, headers=headers)
+        resp = _http.get(url_to_fetch, timeout=HTTP_TIMEOUT, headers=headers)
         resp.raise_for_status()
         
         # Check if we got actual image data
@@ -125,12 +174,19 @@ def get_artwork_png_b64(artwork_url: str) -> str:
             # Or try adding a format parameter
             alt_url = artwork_url.replace('hqdefault', 'mqdefault')
             if alt_url != artwork_url:
-                resp = requests.get(alt_url, timeout=5, headers=headers)
+                resp = _http.get(alt_url, timeout=HTTP_TIMEOUT, headers=headers)
                 resp.raise_for_status()
                 if b'ftypavif' in resp.content[:32]:
                     print(f"[IMAGE] Still AVIF, skipping artwork")
                     return None
         
+        # Same bytes seen under another URL - reuse that conversion
+        content_key = _content_key("b64", resp.content)
+        cached = _cache_get(_content_cache, content_key)
+        if cached is not None:
+            _cache_put(_url_cache, ("b64", artwork_url), cached)
+            return cached
+        
         # Load image from bytes
         img_bytes = io.BytesIO(resp.content)
         try:
@@ -157,8 +213,8 @@ def get_artwork_png_b64(artwork_url: str) -> str:
         b64 = base64.b64encode(rgb565_bytes).decode("ascii")
         
         # Cache it
-        _last_url = artwork_url
-        _last_png_b64 = b64
+        _cache_put(_url_cache, ("b64", artwork_url), b64)
+        _cache_put(_content_cache, content_key, b64)
         
         print(f"[IMAGE] RGB565 b64 size: {len(b64)} chars ({len(rgb565_bytes)} bytes)")
         return b64
@@ -177,6 +233,11 @@ def rgb_to_rgb565(img: Image.Image) -> bytes:
     """
     Convert PIL Image to RGB565 bytes (little-endian for ESP32).
     """
+    if HAS_NUMPY:
+        a = np.asarray(img, dtype=np.uint16)
+        rgb565 = ((a[..., 0] >> 3) << 11) | ((a[..., 1] >> 2) << 5) | (a[..., 2] >> 3)
+        return rgb565.astype("<u2").tobytes()
+
     pixels = img.load()
     width, height = img.size
     
@@ -227,7 +288,6 @@ def get_artwork_rgb565_base64(url: str) -> str:
 
 def clear_cache():
     """Clear the image cache."""
-    global _last_url, _last_rgb565, _last_png_b64
-    _last_url = None
-    _last_rgb565 = None
-    _last_png_b64 = None
+    with _cache_lock:
+        _url_cache.clear()
+        _content_cache.clear()
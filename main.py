@@ -1,40 +1,116 @@
 import threading
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO
+
+# orjson is a much faster encoder for REST responses and Socket.IO frames; stdlib json is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional binary encoding for the system_info Socket.IO event
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# Optional gzip for JSON responses
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
+
+if HAS_ORJSON:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson (always compact, keys unsorted)."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    class _SocketIOJson:
+        """json-module stand-in so python-socketio encodes packets with orjson."""
+
+        @staticmethod
+        def dumps(obj, *args, **kwargs):
+            return orjson.dumps(obj, option=_ORJSON_OPTS).decode()
+
+        @staticmethod
+        def loads(s, *args, **kwargs):
+            return orjson.loads(s)
+
 app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
+if HAS_ORJSON:
+    # Every jsonify() call goes through app.json
+    app.json = OrjsonProvider(app)
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading", json=_SocketIOJson)
+else:
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+# No indentation or key sorting on responses (the orjson provider already never does either)
+app.json.sort_keys = False
+app.json.compact = True
+if HAS_COMPRESS:
+    # Small bodies aren't worth the CPU; Socket.IO frames are compressed by engine.io already
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_MIN_SIZE"] = 500
+    app.config["COMPRESS_ALGORITHM"] = "gzip"
+    Compress(app)
 
 import os
+import sys
 import queue
+import heapq
+import logging
+import logging.handlers
+from collections import namedtuple
 import base64
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
 import webbrowser
 import urllib.parse
 
 # === TASK MANAGER ADDITIONS ===
 import psutil
-import datetime
 import time
 import serial
 from serial import SerialException, SerialTimeoutException
-from control_media import spotifyPlay, spotifyPause, spotifyNext, spotifyPrevious, media_play_pause, media_next, media_previous, get_spotify_progress, is_app_playing
+from control_media import spotifyPlay, spotifyPause, spotifyNext, spotifyPrevious, media_play_pause, media_next, media_previous, get_spotify_progress, is_app_playing, load_tokens, save_tokens
 from image_utils import get_artwork_rgb565_base64, get_artwork_png_b64, clear_cache as clear_image_cache
 
 # Spotify Queue Manager for playlist/queue features
 from spotify_queue import get_queue_manager, SpotifyQueueManager
 
 # Transport abstraction for Serial/TCP communication
-from transport import get_transport_manager, TransportManager
+from transport import get_transport_manager, TransportManager, encode_frame
 
 # GPU monitoring (optional - works with NVIDIA GPUs)
+# Prefer NVML: an in-process library call, where GPUtil spawns and parses nvidia-smi every poll
+try:
+    import pynvml
+    pynvml.nvmlInit()
+    _nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+    HAS_NVML = True
+except Exception:
+    HAS_NVML = False
+
 try:
     import GPUtil
     HAS_GPU = True
 except ImportError:
-    HAS_GPU = False
-    print("[INFO] GPUtil not installed - GPU monitoring disabled. Install with: pip install GPUtil")
+    HAS_GPU = HAS_NVML
+    if not HAS_GPU:
+        print("[INFO] pynvml/GPUtil not installed - GPU monitoring disabled. Install with: pip install nvidia-ml-py")
 
 # Discord voice monitoring (optional - requires discord.py)
 try:
@@ -51,16 +127,27 @@ pending_command = None
 CLIENT_ID = os.getenv("CLIENT_ID", "").strip('"')
 CLIENT_SECRET = os.getenv("CLIENT_SECRET", "").strip('"')
 REDIRECT_URI = os.getenv("REDIRECT_URI", "").strip('"')
-connected_clients = {}
-title_data = ""
-artist_data = ""
-album_data = ""
-artwork_data = ""
-# Progress data from browser extension (for YouTube, etc.)
-position_data = 0  # Current position in seconds
-duration_data = 0  # Total duration in seconds
-is_playing_data = False  # Whether media is currently playing
-media_source = ""  # Track which source the media is from (e.g., "youtube", "spotify")
+connected_clients = set()  # Socket.IO session ids of connected browsers
+# Browser-extension media metadata, held in one immutable record. Handlers swap in a new
+# record (a single reference assignment), so readers always see a consistent set of fields.
+#   artwork_url: http(s) URL extracted from artwork when it's received
+#   position/duration: progress in seconds (YouTube, etc.)
+#   source: which source the media is from (e.g., "youtube", "spotify")
+MediaState = namedtuple(
+    "MediaState",
+    "title artist album artwork artwork_url position duration playing source",
+)
+_media_state = MediaState("", "", "", "", None, 0, 0, False, "")
+_media_lock = threading.Lock()  # serializes writers only; readers just take the reference
+
+
+def _update_media(**fields):
+    """Replace the given fields of the media state."""
+    global _media_state
+    with _media_lock:
+        _media_state = _media_state._replace(**fields)
+
+
 # YouTube playlist data from browser extension
 youtube_playlist_data = {
     "name": "",           # Playlist name
@@ -68,8 +155,25 @@ youtube_playlist_data = {
     "current_index": 0,   # Current video index
     "total_videos": 0,    # Total videos in playlist
 }
-client_creds = f"{CLIENT_ID}:{CLIENT_SECRET}"
-encoded = base64.b64encode(client_creds.encode()).decode()
+_youtube_playlist_version = 0  # bumped whenever the playlist above is replaced
+# Spotify token endpoint auth is constant for the process lifetime - build it once
+_AUTH_B64 = base64.b64encode(f"{CLIENT_ID}:{CLIENT_SECRET}".encode()).decode()
+TOKEN_HEADERS = {"Authorization": f"Basic {_AUTH_B64}"}
+# Shared HTTP session so repeated Spotify calls reuse TCP+TLS connections
+_http = requests.Session()
+_http.headers.update({"User-Agent": "MediaTracker/1.0"})
+_http_adapter = HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+)
+_http.mount("https://", _http_adapter)
+_http.mount("http://", _http_adapter)
+# The /v1/me/player poll runs on the monitor thread, so it gets its own pooled session
+# without retries - a failed poll just waits for the next one (with backoff) instead
+# of stalling the feed through Retry's backoff sleeps.
+_http_poll = requests.Session()
+_http_poll.headers.update({"User-Agent": "MediaTracker/1.0"})
+_http_poll.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
 
 # === SERIAL CONFIG FOR ESP ===
 # Set this to the actual COM your ESP shows up as in Device Manager.
@@ -77,24 +181,49 @@ encoded = base64.b64encode(client_creds.encode()).decode()
 SERIAL_PORT = os.getenv("SERIAL_PORT", "COM3")
 SERIAL_BAUD = int(os.getenv("SERIAL_BAUD", "115200"))
 ser = None
-_serial_queue = queue.Queue()
+_serial_queue = queue.SimpleQueue()  # C-implemented FIFO; bounded by hand via SERIAL_MAX_QUEUE
 _serial_priority_queue = queue.Queue(maxsize=2)  # artwork and other priority messages
 SERIAL_MAX_QUEUE = int(os.getenv("SERIAL_MAX_QUEUE", "8"))
-SERIAL_MIN_INTERVAL = float(os.getenv("SERIAL_MIN_INTERVAL", "0.1"))  # min interval between serial snapshots (seconds)
+SERIAL_KEEPALIVE_INTERVAL = float(os.getenv("SERIAL_KEEPALIVE_INTERVAL", "30"))  # resend an unchanged snapshot after this many seconds
 _last_serial_sent_time = 0.0
 _last_sent_snapshot_fingerprint = None
 SERIAL_MAX_QUEUE = int(os.getenv("SERIAL_MAX_QUEUE", "8"))
+SERIAL_BATCH_MAX = 16 * 1024  # max bytes the serial writer coalesces into one write
+SERIAL_WRITE_TIMEOUT = float(os.getenv("SERIAL_WRITE_TIMEOUT", "0.5"))  # seconds before a stalled write is abandoned
 SERIAL_DEBUG = os.getenv("SERIAL_DEBUG", "1") in ("1", "true", "True")
 DISABLE_AUTO_SERIAL = os.getenv("DISABLE_AUTO_SERIAL", "0") in ("1", "true", "True")
 
+# Logger for the high-rate Socket.IO metadata handlers. Records go through a queue to a
+# background listener, so handler threads never block on stdout; with SERIAL_DEBUG off,
+# debug calls return before formatting anything.
+log = logging.getLogger("mediatracker")
+log.setLevel(logging.DEBUG if SERIAL_DEBUG else logging.INFO)
+log.propagate = False
+_log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stdout = logging.StreamHandler(sys.stdout)
+_log_stdout.setFormatter(logging.Formatter("%(message)s"))  # messages keep their [TAG] prefix
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stdout)
+_log_listener.start()
+
 # === TRANSPORT CONFIG (WiFi + Serial) ===
 # Transport mode: "serial", "tcp", or "both" (default: both)
 TRANSPORT_MODE = os.getenv("TRANSPORT_MODE", "both").lower()
+# Snapshot encoding on the ESP link: "json" (newline-delimited) or "msgpack"
+# (length-prefixed binary frames - the ESP firmware must support it)
+ESP_WIRE_FORMAT = os.getenv("ESP_WIRE_FORMAT", "json").lower()
+# system_info encoding for browsers: "json" or "msgpack" (sent as a binary event -
+# the web client must decode it, so this is opt-in)
+SOCKETIO_WIRE_FORMAT = os.getenv("SOCKETIO_WIRE_FORMAT", "json").lower()
 # TCP server port for WiFi connection from ESP32
 TCP_PORT = int(os.getenv("TCP_PORT", "5555"))
 TCP_HOST = os.getenv("TCP_HOST", "0.0.0.0")
 # ========================================
 
+# In threading mode Flask-SocketIO serves through Werkzeug's development server, which it
+# refuses to run outside debug mode unless told to. Opt in for a local/LAN deployment.
+ALLOW_UNSAFE_WERKZEUG = os.getenv("ALLOW_UNSAFE_WERKZEUG", "0") in ("1", "true", "True")
+
 # === DISCORD CONFIG (Voice call monitoring) ===
 # Discord bot token for voice monitoring
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "").strip('"')
@@ -123,28 +252,89 @@ print(f"[CONFIG] SERIAL_PORT={SERIAL_PORT} BAUD={SERIAL_BAUD}")
 # Cache for expensive process list (only update every 2 seconds)
 _proc_cache = {"data": [], "last_update": 0}
 _PROC_CACHE_TTL = 2.0
+_IDLE_PROC_NAMES = {"system idle process", "idle"}
+_utc_offset_cache = {"minute": None, "value": 0}
+# Reused across calls; every key is overwritten each time, so only the final copy allocates
+_snap = {}
+# Last top-5 ranking and the columns built from it
+_proc_cols = {"key": None, "cols": None}
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _iter_rss_linux():
+    """Yield (pid, name, rss_bytes) straight from /proc (Linux only).
+
+    Two small reads per PID (statm + comm) instead of psutil's Process setup.
+    comm is cut to 15 chars by the kernel, so those names are extended from
+    cmdline[0] the way psutil's name() does - _terminate_by_name compares
+    against psutil names.
+    """
+    for entry in os.scandir("/proc"):
+        name = entry.name
+        if not name.isdigit():
+            continue
+        try:
+            fd = os.open(f"/proc/{name}/statm", os.O_RDONLY)
+            try:
+                statm = os.read(fd, 64)
+            finally:
+                os.close(fd)
+            fd = os.open(f"/proc/{name}/comm", os.O_RDONLY)
+            try:
+                comm = os.read(fd, 64)
+            finally:
+                os.close(fd)
+            rss = int(statm.split(None, 2)[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            # Process exited or isn't readable
+            continue
+        pname = comm.decode("utf-8", errors="replace").rstrip("\n")
+        if len(pname) >= 15:
+            try:
+                with open(f"/proc/{name}/cmdline", "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0]
+                full = os.path.basename(argv0.decode("utf-8", errors="replace"))
+                if full.startswith(pname):
+                    pname = full
+            except OSError:
+                pass
+        yield int(name), pname, rss
+
+# Request handlers and the monitor loop run on separate OS threads and share `_snap`
+_snap_lock = threading.Lock()
 
 def get_system_snapshot():
     """Return a task-manager style snapshot for the UI and ESP."""
+    with _snap_lock:
+        return _build_system_snapshot()
+
+def _build_system_snapshot():
     global _proc_cache
-    data = {}
+    data = _snap
 
-    # Time info
+    # Time info. The UTC offset only changes on DST transitions, which fall on whole
+    # minutes (not always whole UTC hours, e.g. +05:30 or +09:45 zones), so re-read it
+    # once per minute.
     ts = time.time()
-    utc_offset = (datetime.datetime.fromtimestamp(ts) -
-                  datetime.datetime.utcfromtimestamp(ts)).total_seconds()
-    data["utc_offset"] = int(utc_offset)
-
-    now = datetime.datetime.now()
-    data["local_time"] = int(now.timestamp())
+    minute = int(ts // 60)
+    if minute != _utc_offset_cache["minute"]:
+        _utc_offset_cache["minute"] = minute
+        _utc_offset_cache["value"] = time.localtime(ts).tm_gmtoff
+    data["utc_offset"] = _utc_offset_cache["value"]
+    data["local_time"] = int(ts)
 
     # CPU and memory (non-blocking - uses cached value from last call)
     data["cpu_percent_total"] = psutil.cpu_percent(interval=None)
     mem = psutil.virtual_memory()
     data["mem_percent"] = mem.percent
 
-    # GPU monitoring (NVIDIA only via GPUtil)
-    if HAS_GPU:
+    # GPU monitoring (NVIDIA only via NVML, or GPUtil as a fallback)
+    if HAS_NVML:
+        try:
+            data["gpu_percent"] = float(pynvml.nvmlDeviceGetUtilizationRates(_nvml_handle).gpu)
+        except Exception:
+            data["gpu_percent"] = 0.0
+    elif HAS_GPU:
         try:
             gpus = GPUtil.getGPUs()
             if gpus:
@@ -170,84 +360,104 @@ def get_system_snapshot():
     now = time.time()
     if now - _proc_cache["last_update"] > _PROC_CACHE_TTL:
         # Time to refresh process list
-        n_cpus = psutil.cpu_count(logical=True) or 1
+        mem_total = mem.total
         processes = []
-        for proc in psutil.process_iter(["pid", "name"]):
-            try:
-                name = proc.info.get("name") or ""
-                # Skip idle/system idle noise
-                if name.lower() in ("system idle process", "idle"):
+        if sys.platform.startswith("linux"):
+            # Read RSS from /proc directly; psutil's per-process setup dominates here
+            for pid, name, rss in _iter_rss_linux():
+                if name.lower() in _IDLE_PROC_NAMES:
                     continue
-
-                # Use memory percentage for sorting
+                mem_p = min(rss * 100.0 / mem_total, 100.0)
+                if mem_p > 0.1:
+                    processes.append((mem_p, pid, name))
+        else:
+            # memory_info is fetched with the iteration; computing the percentage from the
+            # virtual_memory() total above avoids memory_percent() re-reading it per process.
+            # process_iter(attrs) fills proc.info via as_dict(), which already runs inside
+            # proc.oneshot(), so name + memory_info share one set of /proc reads per PID.
+            for proc in psutil.process_iter(["pid", "name", "memory_info"]):
                 try:
-                    mem_p = proc.memory_percent()
-                except Exception:
-                    mem_p = 0.0
-                # Clamp to [0, 100] for display sanity
-                if mem_p < 0:
-                    mem_p = 0.0
-                if mem_p > 100.0:
-                    mem_p = 100.0
+                    info = proc.info
+                    name = info.get("name") or ""
+                    # Skip idle/system idle noise
+                    if name.lower() in _IDLE_PROC_NAMES:
+                        continue
 
-                if mem_p > 0.1:
-                    processes.append((mem_p, proc.pid, name))
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
+                    # Use memory percentage for sorting
+                    mem_info = info.get("memory_info")
+                    mem_p = mem_info.rss * 100.0 / mem_total if mem_info is not None else 0.0
+                    # Clamp to [0, 100] for display sanity
+                    if mem_p < 0:
+                        mem_p = 0.0
+                    if mem_p > 100.0:
+                        mem_p = 100.0
+
+                    if mem_p > 0.1:
+                        processes.append((mem_p, proc.pid, name))
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
 
-        procs_sorted = sorted(processes, key=lambda x: x[0], reverse=True)[:5]
+        # Partial selection - only the top 5 are needed, not a full sort
+        procs_sorted = heapq.nlargest(5, processes)
         _proc_cache["data"] = procs_sorted
         _proc_cache["last_update"] = now
     else:
         procs_sorted = _proc_cache["data"]
 
-    # Provide both a backward-compatible `cpu_top5_process` (string list) and a richer 'proc_top5'
-    # Create display-friendly names (strip .exe and paths)
+    # The top 5 rarely reshuffle between refreshes; reuse the previous columns
+    # (and skip the name cleanup) when the pid/memory ranking is unchanged.
+    key = tuple((p[1], round(p[0], 1)) for p in procs_sorted)
+    if key != _proc_cols["key"]:
+        # Create display-friendly names (strip .exe and paths)
     
-    # Friendly name mappings for common apps
-    FRIENDLY_NAMES = {
-        "code": "VS Code",
-        "Code": "VS Code",
-        "msedge": "Edge",
-        "chrome": "Chrome",
-        "firefox": "Firefox",
-        "brave": "Brave",
-        "spotify": "Spotify",
-        "discord": "Discord",
-        "slack": "Slack",
-        "teams": "Teams",
-        "explorer": "Explorer",
-        "Memory Compression": "Sys Memory",  # Windows memory compression process
-        "vmmem": "WSL Memory",  # WSL virtual machine memory
-        "dwm": "Desktop WM",  # Desktop Window Manager
-        "SearchHost": "Search",
-        "RuntimeBroker": "Runtime",
-        "svchost": "System",
-    }
+        # Friendly name mappings for common apps
+        FRIENDLY_NAMES = {
+            "code": "VS Code",
+            "Code": "VS Code",
+            "msedge": "Edge",
+            "chrome": "Chrome",
+            "firefox": "Firefox",
+            "brave": "Brave",
+            "spotify": "Spotify",
+            "discord": "Discord",
+            "slack": "Slack",
+            "teams": "Teams",
+            "explorer": "Explorer",
+            "Memory Compression": "Sys Memory",  # Windows memory compression process
+            "vmmem": "WSL Memory",  # WSL virtual machine memory
+            "dwm": "Desktop WM",  # Desktop Window Manager
+            "SearchHost": "Search",
+            "RuntimeBroker": "Runtime",
+            "svchost": "System",
+        }
     
-    cleaned = []
-    for p in procs_sorted:
-        mem_p, pid, name = p
-        name_str = name or ""
-        # If name is a path, use basename
-        try:
-            name_str = os.path.basename(name_str)
-        except Exception:
-            pass
-        display_name = name_str
-        if display_name.lower().endswith(".exe"):
-            display_name = display_name[:-4]
+        cleaned = []
+        for p in procs_sorted:
+            mem_p, pid, name = p
+            # If name is a path, use basename (handles both Windows and POSIX separators)
+            name_str = (name or "").rpartition("\\")[2].rpartition("/")[2]
+            display_name = name_str[:-4] if name_str[-4:].lower() == ".exe" else name_str
         
-        # Apply friendly name mapping
-        if display_name in FRIENDLY_NAMES:
-            display_name = FRIENDLY_NAMES[display_name]
+            # Apply friendly name mapping
+            if display_name in FRIENDLY_NAMES:
+                display_name = FRIENDLY_NAMES[display_name]
         
-        cleaned.append((mem_p, pid, name_str, display_name))
+            cleaned.append((mem_p, pid, name_str, display_name))
 
-    data["cpu_top5_process"] = [f"{p[0]:.1f}% {p[3]}" for p in cleaned]
-    # Rich object list for the ESP to parse PID + mem% + name + display_name
-    data["proc_top5"] = [{"pid": p[1], "mem": round(p[0], 1), "name": p[2], "display_name": p[3]} for p in cleaned]
-    return data
+        # Columnar (one array per field) so keys aren't repeated per process on the wire;
+        # the ESP zips these back together by index.
+        _proc_cols["key"] = key
+        _proc_cols["cols"] = (
+            [p[1] for p in cleaned],
+            [round(p[0], 1) for p in cleaned],
+            [p[2] for p in cleaned],
+            [p[3] for p in cleaned],
+        )
+
+    (data["proc_pids"], data["proc_mems"],
+     data["proc_names"], data["proc_display_names"]) = _proc_cols["cols"]
+    # Callers queue/emit the result from other threads, so hand back a snapshot copy
+    return data.copy()
 
 
 def get_discord_snapshot():
@@ -274,66 +484,142 @@ def get_discord_snapshot():
         return None
 
 
-# Artwork fetching state (shared between threads)
-_artwork_state = {
-    "pending_url": None,
-    "ready_b64": None,
-    "ready_url": None,
-    "fetching": False
-}
-_artwork_lock = threading.Lock()
+# Artwork fetching handoff between the monitor loop and the fetch worker.
+# Both queues hold at most one item - only the latest URL / result matters.
+_artwork_requests = queue.Queue(maxsize=1)  # url to fetch
+_artwork_ready = queue.Queue(maxsize=1)     # (url, envelope line bytes or None on failure)
+_artwork_requested_url = None  # last URL handed to the worker (monitor loop only)
+
+
+def _put_latest(q: queue.Queue, item):
+    """Put item into a bounded queue, dropping the oldest entries if it's full.
+
+    Eviction and insert happen under one hold of the queue's mutex, so a full queue
+    costs a single lock round trip and can't race another producer into queue.Full.
+    """
+    with q.mutex:
+        while 0 < q.maxsize <= len(q.queue):
+            q.queue.popleft()
+            q.unfinished_tasks -= 1  # the evicted item will never be task_done()'d
+        q.queue.append(item)
+        q.unfinished_tasks += 1
+        q.not_empty.notify()
+
 
 def artwork_fetch_worker():
     """Background thread that fetches artwork without blocking main loop."""
-    global _artwork_state
     print("[ARTWORK WORKER] Thread started")
     while True:
-        url_to_fetch = None
-        
-        with _artwork_lock:
-            if _artwork_state["pending_url"] and not _artwork_state["fetching"]:
-                url_to_fetch = _artwork_state["pending_url"]
-                _artwork_state["fetching"] = True
-        
-        if url_to_fetch:
-            try:
-                print(f"[ARTWORK WORKER] Fetching: {url_to_fetch[:60]}...")
-                b64 = get_artwork_png_b64(url_to_fetch)
-                with _artwork_lock:
-                    if b64:
-                        _artwork_state["ready_b64"] = b64
-                        _artwork_state["ready_url"] = url_to_fetch
-                        print(f"[ARTWORK WORKER] Ready! {len(b64)} chars")
-                    else:
-                        print("[ARTWORK WORKER] Failed to get b64")
-                    _artwork_state["fetching"] = False
-                    _artwork_state["pending_url"] = None
-            except Exception as e:
-                print(f"[ARTWORK WORKER] Error: {e}")
-                import traceback
-                traceback.print_exc()
-                with _artwork_lock:
-                    _artwork_state["fetching"] = False
-                    _artwork_state["pending_url"] = None
-        
-        time.sleep(0.1)
+        # Blocks until the monitor loop hands over a URL - no polling while idle
+        url_to_fetch = _artwork_requests.get()
+        envelope = None
+        try:
+            print(f"[ARTWORK WORKER] Fetching: {url_to_fetch[:60]}...")
+            b64 = get_artwork_png_b64(url_to_fetch)
+            if b64:
+                # Base64 is plain ASCII with nothing to escape, so build the JSON line
+                # directly, once per track, instead of encoding it in the monitor loop
+                envelope = b'{"artwork_b64":"' + b64.encode("ascii") + b'"}\n'
+                print(f"[ARTWORK WORKER] Ready! {len(b64)} chars")
+            else:
+                print("[ARTWORK WORKER] Failed to get b64")
+        except Exception as e:
+            print(f"[ARTWORK WORKER] Error: {e}")
+            import traceback
+            traceback.print_exc()
+        _put_latest(_artwork_ready, (url_to_fetch, envelope))
 
 # Start artwork worker thread
 _artwork_thread = threading.Thread(target=artwork_fetch_worker, daemon=True)
 _artwork_thread.start()
 
 
+# Monitor rate while nothing consumes snapshots (no browser, no ESP transport)
+MONITOR_IDLE_INTERVAL = float(os.getenv("MONITOR_IDLE_INTERVAL", "5.0"))
+# Set on browser connect to cut an idle wait short (async-mode aware event)
+_fast_tick = socketio.server.eio.create_event()
+# Browsers only get a snapshot when it meaningfully changed, or at least this often
+EMIT_WATCHDOG_INTERVAL = float(os.getenv("EMIT_WATCHDOG_INTERVAL", "1.0"))
+EMIT_CPU_DELTA = float(os.getenv("EMIT_CPU_DELTA", "2.0"))  # CPU % change that forces an emit
+# What was last emitted to browsers (ts=0 forces the next emit, e.g. after a connect)
+_last_emit = {"ts": 0.0, "cpu": None, "pids": None, "media": None}
+
+
+def _system_info_payload(snapshot):
+    """Encode a snapshot for the system_info Socket.IO event."""
+    if SOCKETIO_WIRE_FORMAT == "msgpack" and HAS_MSGPACK:
+        return msgpack.packb(snapshot, use_bin_type=True)
+    return snapshot
+
+
+def _should_emit(snapshot, media, now):
+    """True if the browser snapshot changed enough (or the watchdog lapsed) to emit."""
+    cpu = snapshot["cpu_percent_total"]
+    pids = snapshot["proc_pids"]
+    media_key = None if media is None else (
+        media.get("title"), media.get("artist"), media.get("is_playing"), media.get("source"),
+    )
+    last_cpu = _last_emit["cpu"]
+    if not (now - _last_emit["ts"] >= EMIT_WATCHDOG_INTERVAL
+            or last_cpu is None or abs(cpu - last_cpu) > EMIT_CPU_DELTA
+            or pids != _last_emit["pids"] or media_key != _last_emit["media"]):
+        return False
+    _last_emit["ts"] = now
+    _last_emit["cpu"] = cpu
+    _last_emit["pids"] = pids
+    _last_emit["media"] = media_key
+    return True
+
+
+def _freeze(value):
+    """Turn nested dicts/lists from a snapshot into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Media fields the ESP renders; queue/playlist are nested and frozen separately
+_MEDIA_FP_FIELDS = ("title", "artist", "album", "position_seconds", "duration_seconds",
+                    "is_playing", "shuffle", "repeat", "is_liked", "has_artwork", "source")
+
+
+def _media_fingerprint(media):
+    """Hashable key covering every media field sent to the ESP."""
+    if media is None:
+        return None
+    return (
+        tuple(media.get(k) for k in _MEDIA_FP_FIELDS),
+        _freeze(media.get("queue")),
+        _freeze(media.get("playlist")),
+    )
+
+
 def system_monitor_loop(interval=2.0):
     """Background loop that broadcasts system info over Socket.IO and serial.
     The loop is scheduled using time.monotonic to maintain regular intervals and
-    avoid jitter from blocking calls. Serial writes are enqueued to `_serial_queue`.
+    avoid jitter from blocking calls. Snapshots are enqueued as dicts and JSON-encoded
+    by the writer threads.
     """
-    global ser, _artwork_state, _last_artwork_url, _last_sent_snapshot_fingerprint, _last_serial_sent_time
+    global ser, _artwork_requested_url, _last_artwork_url, _last_sent_snapshot_fingerprint, _last_serial_sent_time
     
     interval = float(interval)
     next_time = time.monotonic()
+    next_warn = 0.0
     while True:
         loop_start = time.monotonic()
+
+        # Nobody to receive the snapshot - skip building it and drop to the idle rate.
+        # A browser connecting wakes us immediately; an ESP is picked up on the next idle tick.
+        transport_mgr = get_transport_manager()
+        if not connected_clients and not transport_mgr.is_connected:
+            # Wait, then clear: a set() that lands before the wait still wakes it, and one
+            # cleared here was preceded by connected_clients.add(), which the next pass sees
+            _fast_tick.wait(MONITOR_IDLE_INTERVAL)
+            _fast_tick.clear()
+            next_time = time.monotonic()
+            continue
         
         snapshot = get_system_snapshot()
 
@@ -345,12 +631,11 @@ def system_monitor_loop(interval=2.0):
             artwork_url = media.pop("artwork_url", None)
 
             # Request artwork fetch in background (non-blocking)
-            if artwork_url and artwork_url != _last_artwork_url:
-                with _artwork_lock:
-                    if not _artwork_state.get("fetching", False):
-                        _artwork_state["pending_url"] = artwork_url
-                        if SERIAL_DEBUG:
-                            print(f"[ARTWORK] Queued for fetch: {artwork_url[:60]}...")
+            if artwork_url and artwork_url != _last_artwork_url and artwork_url != _artwork_requested_url:
+                _put_latest(_artwork_requests, artwork_url)
+                _artwork_requested_url = artwork_url
+                if SERIAL_DEBUG:
+                    print(f"[ARTWORK] Queued for fetch: {artwork_url[:60]}...")
             
             snapshot["media"] = media
 
@@ -359,19 +644,17 @@ def system_monitor_loop(interval=2.0):
         if discord_data is not None:
             snapshot["discord"] = discord_data
 
-        # 1) Emit to web clients via Socket.IO
-        socketio.emit("system_info", snapshot)
+        # 1) Emit to web clients via Socket.IO (skip serialization if none are connected,
+        #    and skip ticks where nothing they display has changed)
+        if connected_clients and _should_emit(snapshot, media, loop_start):
+            socketio.emit("system_info", _system_info_payload(snapshot))
 
         # 2) Send to ESP via transport manager (Serial and/or TCP)
-        transport_mgr = get_transport_manager()
         if transport_mgr.is_connected:
             try:
-                line = json.dumps(snapshot) + "\n"
-                line_bytes = line.encode("utf-8")
-
                 if SERIAL_DEBUG:
                     loop_time = (time.monotonic() - loop_start) * 1000
-                    print(f"[LOOP] {loop_time:.0f}ms, JSON size: {len(line_bytes)} bytes")
+                    print(f"[LOOP] {loop_time:.0f}ms")
                     # Warn if loop took unusually long
                     if loop_time > max(200, interval * 1000 * 5):
                         print(f"[LOOP WARNING] High jitter: {loop_time:.0f}ms")
@@ -379,37 +662,44 @@ def system_monitor_loop(interval=2.0):
                 # Use background writer to avoid blocking the monitoring loop
                 now_ts = time.monotonic()
                 # Create a compact fingerprint of the snapshot to decide if we should send it
-                try:
-                    fp_source = json.dumps({
-                        "cpu": snapshot.get("cpu_percent_total"),
-                        "mem": snapshot.get("mem_percent"),
-                        "media": snapshot.get("media"),
-                        "time": snapshot.get("local_time")
-                    }, sort_keys=True)
-                except Exception:
-                    fp_source = ""
-                fingerprint = str(hash(fp_source))
-
-                # If fingerprint hasn't changed and we recently sent, skip to reduce traffic
-                should_send_snapshot = True
-                if _last_sent_snapshot_fingerprint == fingerprint and (now_ts - _last_serial_sent_time) < SERIAL_MIN_INTERVAL:
-                    should_send_snapshot = False
+                # (a tuple hash of everything the ESP renders - no JSON encode just to compare).
+                # local_time only counts to the minute so the clock stays current while an
+                # otherwise idle snapshot still dedups between minute ticks.
+                # These keys are always set by get_system_snapshot, so index directly.
+                fingerprint = hash((
+                    snapshot["cpu_percent_total"],
+                    snapshot["mem_percent"],
+                    snapshot["gpu_percent"],
+                    snapshot["battery_percent"],
+                    snapshot["power_plugged"],
+                    snapshot["local_time"] // 60,
+                    tuple(snapshot["proc_pids"]),
+                    tuple(snapshot["proc_mems"]),
+                    _media_fingerprint(media),
+                    _freeze(discord_data),
+                ))
+
+                # Only send when something changed, plus a periodic keepalive
+                should_send_snapshot = (
+                    _last_sent_snapshot_fingerprint != fingerprint
+                    or (now_ts - _last_serial_sent_time) >= SERIAL_KEEPALIVE_INTERVAL
+                )
 
                 if should_send_snapshot:
                     try:
-                        # Use transport manager for sending (supports both Serial and TCP)
+                        # Use transport manager for sending (supports both Serial and TCP).
+                        # The dict is JSON-encoded on the writer thread, not here.
                         transport_mgr = get_transport_manager()
-                        transport_mgr.queue_send(line_bytes, priority=False)
+                        transport_mgr.queue_send(snapshot, priority=False)
                         
                         # Also use legacy queue for backward compatibility
                         if _serial_queue.qsize() >= SERIAL_MAX_QUEUE:
                             # Drop older message to make space and keep latest
                             try:
                                 _serial_queue.get_nowait()
-                                _serial_queue.task_done()
                             except Exception:
                                 pass
-                        _serial_queue.put({"type": "snapshot", "payload": line_bytes}, block=False)
+                        _serial_queue.put({"type": "snapshot", "obj": snapshot})
                         _last_sent_snapshot_fingerprint = fingerprint
                         _last_serial_sent_time = now_ts
                     except Exception as e:
@@ -417,30 +707,26 @@ def system_monitor_loop(interval=2.0):
                             print(f"[SERIAL WRITER] Queue put failed: {e}")
 
                 # Check if artwork is ready to send
-                with _artwork_lock:
-                    ready_b64 = _artwork_state["ready_b64"]
-                    ready_url = _artwork_state["ready_url"]
-
-                if ready_b64 and ready_url and ready_url != _last_artwork_url:
-                    print(f"[ARTWORK] Queuing to ESP... ({len(ready_b64)} chars) url={ready_url}")
+                try:
+                    ready_url, msg_bytes = _artwork_ready.get_nowait()
+                except queue.Empty:
+                    ready_url, msg_bytes = None, None
+                if ready_url and not msg_bytes and ready_url == _artwork_requested_url:
+                    # Fetch failed - allow the same URL to be requested again
+                    _artwork_requested_url = None
+
+                if msg_bytes and ready_url and ready_url != _last_artwork_url:
+                    print(f"[ARTWORK] Queuing to ESP... ({len(msg_bytes)} bytes) url={ready_url}")
                     # Mark as sent IMMEDIATELY to prevent re-queuing on next loop
                     _last_artwork_url = ready_url
                     
-                    artwork_msg = json.dumps({"artwork_b64": ready_b64}) + "\n"
-                    msg_bytes = artwork_msg.encode("utf-8")
                     try:
                         # Use transport manager for artwork (priority)
                         transport_mgr = get_transport_manager()
                         transport_mgr.queue_send(msg_bytes, priority=True, metadata={"type": "artwork", "url": ready_url})
                         
                         # Also use legacy queue for backward compatibility
-                        if _serial_priority_queue.full():
-                            try:
-                                _serial_priority_queue.get_nowait()
-                                _serial_priority_queue.task_done()
-                            except Exception:
-                                pass
-                        _serial_priority_queue.put({"type": "artwork", "payload": msg_bytes, "url": ready_url}, block=False)
+                        _put_latest(_serial_priority_queue, {"type": "artwork", "payload": msg_bytes, "url": ready_url})
                     except Exception as e:
                         if SERIAL_DEBUG:
                             print(f"[SERIAL WRITER] Artwork queue put failed: {e}")
@@ -448,14 +734,15 @@ def system_monitor_loop(interval=2.0):
                 if SERIAL_DEBUG:
                     print(f"[TRANSPORT ERROR] {e}")
         else:
-            # Debug: show if transport is not connected
-            if int(loop_start) % 10 == 0:  # Print every ~10 seconds
+            # Debug: show if transport is not connected (at most every 10 seconds)
+            if loop_start >= next_warn:
                 print("[WARNING] No transport connected, data not sent to ESP")
+                next_warn = loop_start + 10.0
 
         # Precise periodic scheduling
         next_time += interval
         sleep_time = max(0, next_time - time.monotonic())
-        socketio.sleep(sleep_time)
+        time.sleep(sleep_time)
 
 
 # ========== QUEUE/PLAYLIST COMMAND HANDLERS ==========
@@ -632,10 +919,12 @@ def _handle_like_track(cmd: dict):
         
         if action == "like":
             success = queue_mgr.save_track(track_id)
+            _liked_cache["until"] = 0.0  # re-check liked state on the next snapshot
             if SERIAL_DEBUG:
                 print(f"[LIKE CMD] like {track_id}: {'OK' if success else 'FAIL'}")
         elif action == "unlike":
             success = queue_mgr.remove_saved_track(track_id)
+            _liked_cache["until"] = 0.0  # re-check liked state on the next snapshot
             if SERIAL_DEBUG:
                 print(f"[LIKE CMD] unlike {track_id}: {'OK' if success else 'FAIL'}")
         else:
@@ -669,9 +958,11 @@ def _handle_like(cmd: dict):
         
         if state:
             success = queue_mgr.save_track(track_id)
+            _liked_cache["until"] = 0.0  # re-check liked state on the next snapshot
             print(f"[LIKE] Saved track {track_id}: {'OK' if success else 'FAIL'}")
         else:
             success = queue_mgr.remove_saved_track(track_id)
+            _liked_cache["until"] = 0.0  # re-check liked state on the next snapshot
             print(f"[LIKE] Removed track {track_id}: {'OK' if success else 'FAIL'}")
             
     except Exception as e:
@@ -708,6 +999,7 @@ def _handle_add_to_playlist(cmd: dict):
             track_id = playback["item"].get("id", "")
             if track_id:
                 success = queue_mgr.save_track(track_id)
+                _liked_cache["until"] = 0.0  # re-check liked state on the next snapshot
                 print(f"[ADD PLAYLIST] Saved to Liked Songs: {'OK' if success else 'FAIL'}")
             return
         
@@ -797,7 +1089,7 @@ def _process_esp_command(cmd: dict):
                 pass
             # Ack to ESP that command was executed
             try:
-                get_transport_manager().queue_send((json.dumps({"ack": "play"}) + "\n").encode("utf-8"), priority=False)
+                get_transport_manager().queue_send({"ack": "play"}, priority=False)
             except Exception:
                 pass
         except Exception as e:
@@ -813,7 +1105,7 @@ def _process_esp_command(cmd: dict):
                 pass
             # Ack to ESP that command was executed
             try:
-                get_transport_manager().queue_send((json.dumps({"ack": "pause"}) + "\n").encode("utf-8"), priority=False)
+                get_transport_manager().queue_send({"ack": "pause"}, priority=False)
             except Exception:
                 pass
         except Exception as e:
@@ -825,7 +1117,7 @@ def _process_esp_command(cmd: dict):
             media_next()
             # Ack to ESP that command was executed
             try:
-                get_transport_manager().queue_send((json.dumps({"ack": "next"}) + "\n").encode("utf-8"), priority=False)
+                get_transport_manager().queue_send({"ack": "next"}, priority=False)
             except Exception:
                 pass
         except Exception as e:
@@ -837,7 +1129,7 @@ def _process_esp_command(cmd: dict):
             media_previous()
             # Ack to ESP that command was executed
             try:
-                get_transport_manager().queue_send((json.dumps({"ack": "previous"}) + "\n").encode("utf-8"), priority=False)
+                get_transport_manager().queue_send({"ack": "previous"}, priority=False)
             except Exception:
                 pass
         except Exception as e:
@@ -929,107 +1221,118 @@ def serial_command_loop():
             return
         while True:
             try:
-                if ser.in_waiting:
-                    line = ser.readline().decode("utf-8", errors="ignore").strip()
-                    if not line:
-                        continue
-                    # Try to parse JSON commands
-                    try:
-                        cmd = json.loads(line)
-                    except Exception:
-                        # Non-JSON lines can be ignored or print for debugging
-                        if SERIAL_DEBUG:
-                            print(f"[SERIAL IN] {line}")
-                        continue
+                # Blocks in the driver for up to the port timeout; b"" on timeout
+                line = ser.readline().decode("utf-8", errors="ignore").strip()
+                if not line:
+                    continue
+                # Try to parse JSON commands
+                try:
+                    cmd = json.loads(line)
+                except Exception:
+                    # Non-JSON lines can be ignored or print for debugging
+                    if SERIAL_DEBUG:
+                        print(f"[SERIAL IN] {line}")
+                    continue
 
-                    if not isinstance(cmd, dict):
-                        continue
+                if not isinstance(cmd, dict):
+                    continue
 
-                    typ = cmd.get("cmd") or cmd.get("type")
-                    if not typ:
-                        continue
-                    
-                    # Debug: show all received commands
-                    print(f"[SERIAL CMD] Received: {typ}")
+                typ = cmd.get("cmd") or cmd.get("type")
+                if not typ:
+                    continue
+                
+                # Debug: show all received commands
+                print(f"[SERIAL CMD] Received: {typ}")
 
-                    if typ == "kill":
-                        pid = cmd.get("pid")
-                        if pid is not None:
-                            try:
-                                pid = int(pid)
-                                # Reuse existing logic: kill by pid using psutil
-                                proc = psutil.Process(pid)
-                                proc.terminate()
-                                try:
-                                    proc.wait(timeout=3)
-                                    status = "terminated"
-                                except psutil.TimeoutExpired:
-                                    proc.kill()
-                                    status = "killed"
-                                if SERIAL_DEBUG:
-                                    print(f"[SERIAL CMD] Killed pid={pid} status={status}")
-                            except Exception as e:
-                                if SERIAL_DEBUG:
-                                    print(f"[SERIAL CMD] Error killing pid {pid}: {e}")
-
-                    elif typ == "play":
+                if typ == "kill":
+                    pid = cmd.get("pid")
+                    if pid is not None:
                         try:
-                            # Use keyboard media key - works with any player
-                            media_play_pause()
-                            # Also emit a socketio command to browser extension as a fallback
+                            pid = int(pid)
+                            # Reuse existing logic: kill by pid using psutil
+                            proc = psutil.Process(pid)
+                            proc.terminate()
                             try:
-                                socketio.emit("command", {"command": "play"})
-                            except Exception as e:
-                                if SERIAL_DEBUG:
-                                    print(f"[SERIAL CMD] socketio emit play failed: {e}")
-                        except Exception as e:
+                                proc.wait(timeout=3)
+                                status = "terminated"
+                            except psutil.TimeoutExpired:
+                                proc.kill()
+                                status = "killed"
                             if SERIAL_DEBUG:
-                                print(f"[SERIAL CMD] Play error: {e}")
-                    elif typ == "pause":
-                        try:
-                            # Use keyboard media key - works with any player
-                            media_play_pause()
-                            # Also emit a socketio command to browser extension as a fallback
-                            try:
-                                socketio.emit("command", {"command": "pause"})
-                            except Exception as e:
-                                if SERIAL_DEBUG:
-                                    print(f"[SERIAL CMD] socketio emit pause failed: {e}")
+                                print(f"[SERIAL CMD] Killed pid={pid} status={status}")
                         except Exception as e:
                             if SERIAL_DEBUG:
-                                print(f"[SERIAL CMD] Pause error: {e}")
-                    elif typ == "next":
+                                print(f"[SERIAL CMD] Error killing pid {pid}: {e}")
+
+                elif typ == "play":
+                    try:
+                        # Use keyboard media key - works with any player
+                        media_play_pause()
+                        # Also emit a socketio command to browser extension as a fallback
                         try:
-                            # Use keyboard media key - works with any player
-                            media_next()
+                            socketio.emit("command", {"command": "play"})
                         except Exception as e:
                             if SERIAL_DEBUG:
-                                print(f"[SERIAL CMD] Next error: {e}")
-                    elif typ == "previous":
+                                print(f"[SERIAL CMD] socketio emit play failed: {e}")
+                    except Exception as e:
+                        if SERIAL_DEBUG:
+                            print(f"[SERIAL CMD] Play error: {e}")
+                elif typ == "pause":
+                    try:
+                        # Use keyboard media key - works with any player
+                        media_play_pause()
+                        # Also emit a socketio command to browser extension as a fallback
                         try:
-                            # Use keyboard media key - works with any player
-                            media_previous()
+                            socketio.emit("command", {"command": "pause"})
                         except Exception as e:
                             if SERIAL_DEBUG:
-                                print(f"[SERIAL CMD] Prev error: {e}")
-                    
-                    # ========== QUEUE/PLAYLIST COMMANDS ==========
-                    elif typ == "queue_action":
-                        _handle_queue_action(cmd)
-                    elif typ == "playlist_action":
-                        _handle_playlist_action(cmd)
-                    elif typ == "like_track":
-                        _handle_like_track(cmd)
-                    # ==============================================
-                    
-                    else:
+                                print(f"[SERIAL CMD] socketio emit pause failed: {e}")
+                    except Exception as e:
                         if SERIAL_DEBUG:
-                            print(f"[SERIAL CMD] Unknown cmd: {cmd}")
+                            print(f"[SERIAL CMD] Pause error: {e}")
+                elif typ == "next":
+                    try:
+                        # Use keyboard media key - works with any player
+                        media_next()
+                    except Exception as e:
+                        if SERIAL_DEBUG:
+                            print(f"[SERIAL CMD] Next error: {e}")
+                elif typ == "previous":
+                    try:
+                        # Use keyboard media key - works with any player
+                        media_previous()
+                    except Exception as e:
+                        if SERIAL_DEBUG:
+                            print(f"[SERIAL CMD] Prev error: {e}")
+                
+                # ========== QUEUE/PLAYLIST COMMANDS ==========
+                elif typ == "queue_action":
+                    _handle_queue_action(cmd)
+                elif typ == "playlist_action":
+                    _handle_playlist_action(cmd)
+                elif typ == "like_track":
+                    _handle_like_track(cmd)
+                # ==============================================
+                
+                else:
+                    if SERIAL_DEBUG:
+                        print(f"[SERIAL CMD] Unknown cmd: {cmd}")
 
             except Exception as e:
                 if SERIAL_DEBUG:
                     print(f"[SERIAL CMD] Reader exception: {e}")
-            time.sleep(0.05)
+                time.sleep(0.5)
+
+
+def _serial_item_bytes(data) -> bytes:
+    """Return the wire bytes for an item from `_serial_queue`."""
+    if data is None:
+        return b""
+    if isinstance(data, dict):
+        if data.get("obj") is not None:
+            return encode_frame(data["obj"], ESP_WIRE_FORMAT)
+        return data.get("payload") or b""
+    return data
 
 
 def _serial_writer_loop():
@@ -1062,16 +1365,27 @@ def _serial_writer_loop():
                 pass
 
             data = _serial_queue.get()
-            if ser is not None and data is not None:
+            # Coalesce whatever else is already queued into a single write (capped at
+            # SERIAL_BATCH_MAX) - one write per item costs a syscall + USB frame each.
+            # Stop early if a priority item arrives so artwork isn't held back.
+            buf = bytearray(_serial_item_bytes(data))
+            while len(buf) < SERIAL_BATCH_MAX and _serial_priority_queue.empty():
                 try:
-                    if isinstance(data, dict) and data.get("payload"):
-                        ser.write(data["payload"])
-                    else:
-                        ser.write(data)
+                    data = _serial_queue.get_nowait()
+                except queue.Empty:
+                    break
+                buf += _serial_item_bytes(data)
+            if ser is not None and buf:
+                try:
+                    ser.write(buf)
+                except SerialTimeoutException:
+                    # Snapshots are superseded by the next tick, so a stalled batch is
+                    # dropped rather than retried (a partial write can't be safely resent)
+                    if SERIAL_DEBUG:
+                        print(f"[SERIAL WRITER] Write timed out, dropped {len(buf)} bytes")
                 except Exception as e:
                     if SERIAL_DEBUG:
                         print(f"[SERIAL WRITER] Write error: {e}")
-            _serial_queue.task_done()
         except Exception as e:
             if SERIAL_DEBUG:
                 print(f"[SERIAL WRITER] Exception: {e}")
@@ -1096,14 +1410,11 @@ def _serial_writer_loop():
 
 
 def prime_psutil():
-    """Prime cpu_percent counters so the first reading isn't 0.0."""
+    """Prime the system-wide cpu_percent counter so the first reading isn't 0.0.
+    Per-process CPU isn't sampled by get_system_snapshot, so there is nothing else to prime.
+    """
     try:
         psutil.cpu_percent(interval=None)
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                proc.cpu_percent(interval=None)
-            except Exception:
-                continue
     except Exception:
         pass
 # ===============================
@@ -1116,10 +1427,11 @@ def callback():
         print(f"[CALLBACK] Received code: {codes}")
     else:
         return "Error: No code received"
-    response = requests.post(
+    response = _http.post(
         "https://accounts.spotify.com/api/token",
-        headers={"Authorization": "Basic " + encoded},
-        data={"grant_type": "authorization_code", "code": codes, "redirect_uri": REDIRECT_URI}
+        headers=TOKEN_HEADERS,
+        data={"grant_type": "authorization_code", "code": codes, "redirect_uri": REDIRECT_URI},
+        timeout=(3.05, 10)
     )
     # Better error visibility for token exchange
     if response.ok:
@@ -1129,8 +1441,7 @@ def callback():
             tokens["obtained_at"] = int(time.time())
         except Exception:
             pass
-        with open("tokens.json", "w") as f:
-            json.dump(tokens, f, indent=3)
+        save_tokens(tokens)
         print("[CALLBACK] Tokens saved to tokens.json")
         print(f"[CALLBACK] REDIRECT_URI used: {REDIRECT_URI}")
         return "Authorization successful. You can close this window."
@@ -1142,86 +1453,128 @@ def callback():
 @socketio.event("connect")
 def handle_connect():
     print(f"[CONNECTED] Client connected")
-    connected_clients["client"] = True
+    connected_clients.add(request.sid)
+    _last_emit["ts"] = 0.0  # send the new client a snapshot on the next tick
+    _fast_tick.set()
     socketio.emit("my_response", {"msg": "Hello from server"})
 
 
 @socketio.on("disconnect")
 def handle_disconnect():
     print(f"[DISCONNECTED] Client disconnected")
-    connected_clients.pop("client", None)
+    connected_clients.discard(request.sid)
 
 
 @socketio.on("sendTitle")
 def receive_title(data):
-    global title_data
-    title_data = data
-    print(f"[RECEIVED TITLE]: {title_data}")
+    _update_media(title=data)
+    log.debug("[RECEIVED TITLE]: %s", data)
 
 
 @socketio.on("sendArtist")
 def receive_artist(data):
-    global artist_data
-    artist_data = data
-    print(f"[RECEIVED ARTIST]: {artist_data}")
+    _update_media(artist=data)
+    log.debug("[RECEIVED ARTIST]: %s", data)
 
 
 @socketio.on("sendAlbum")
 def receive_album(data):
-    global album_data
-    album_data = data
-    print(f"[RECEIVED ALBUM]: {album_data}")
+    _update_media(album=data)
+    log.debug("[RECEIVED ALBUM]: %s", data)
 
 
 @socketio.on("sendArtwork")
 def receive_artwork(data):
-    global artwork_data
-    artwork_data = data
-    print(f"[RECEIVED ARTWORK]: {artwork_data}")
+    # The extension resends the same artwork with other fields; nothing to do then
+    if data == _media_state.artwork:
+        return
+    # artwork can be a URL string or {"src": url} object - resolve it once here
+    # rather than on every monitor tick
+    artwork_url = None
+    if isinstance(data, dict) and "src" in data:
+        artwork_url = data["src"]
+    elif isinstance(data, str) and data.startswith("http"):
+        artwork_url = data
+    _update_media(artwork=data, artwork_url=artwork_url)
+    log.debug("[RECEIVED ARTWORK]: %s", data)
 
 
 @socketio.on("sendPosition")
 def receive_position(data):
     """Receive current playback position in seconds from browser extension."""
-    global position_data
     try:
-        position_data = int(float(data))
+        position = int(float(data))
     except (ValueError, TypeError):
-        position_data = 0
+        position = 0
+    # timeupdate can fire up to 60x/s but the ESP only shows whole seconds. Skip the
+    # state swap (and media snapshot rebuild) while the second is unchanged; every
+    # new value, including a seek or the position at pause, is still stored.
+    if position == _media_state.position:
+        return
+    _update_media(position=position)
     # Only print occasionally to avoid spam
-    # print(f"[RECEIVED POSITION]: {position_data}s")
+    # log.debug("[RECEIVED POSITION]: %ss", position)
 
 
 @socketio.on("sendDuration")
 def receive_duration(data):
     """Receive total duration in seconds from browser extension."""
-    global duration_data
     try:
-        duration_data = int(float(data))
+        duration = int(float(data))
     except (ValueError, TypeError):
-        duration_data = 0
-    print(f"[RECEIVED DURATION]: {duration_data}s")
+        duration = 0
+    _update_media(duration=duration)
+    log.debug("[RECEIVED DURATION]: %ss", duration)
 
 
 @socketio.on("sendPlaying")
 def receive_playing(data):
     """Receive play/pause state from browser extension."""
-    global is_playing_data
     if isinstance(data, bool):
-        is_playing_data = data
+        playing = data
     elif isinstance(data, str):
-        is_playing_data = data.lower() in ("true", "1", "playing")
+        playing = data.lower() in ("true", "1", "playing")
     else:
-        is_playing_data = bool(data)
-    print(f"[RECEIVED PLAYING STATE]: {is_playing_data}")
+        playing = bool(data)
+    _update_media(playing=playing)
+    log.debug("[RECEIVED PLAYING STATE]: %s", playing)
 
 
 @socketio.on("sendSource")
 def receive_source(data):
     """Receive media source identifier (e.g., 'youtube', 'spotify')."""
-    global media_source
-    media_source = str(data).lower() if data else ""
-    print(f"[RECEIVED SOURCE]: {media_source}")
+    source = str(data).lower() if data else ""
+    _update_media(source=source)
+    log.debug("[RECEIVED SOURCE]: %s", source)
+
+
+# Field name -> handler for the bulk sendMeta event
+_META_HANDLERS = {
+    "title": receive_title,
+    "artist": receive_artist,
+    "album": receive_album,
+    "artwork": receive_artwork,
+    "position": receive_position,
+    "duration": receive_duration,
+    "playing": receive_playing,
+    "source": receive_source,
+}
+
+
+@socketio.on("sendMeta")
+def receive_meta(data):
+    """
+    Receive several metadata fields in one event from the browser extension.
+    Expected format (any subset of keys):
+    {"title", "artist", "album", "artwork", "position", "duration", "playing", "source"}
+    The per-field send* events are still accepted for older extension builds.
+    """
+    if not isinstance(data, dict):
+        log.info("[RECEIVED META]: Invalid format - %s", type(data))
+        return
+    for key, handler in _META_HANDLERS.items():
+        if key in data:
+            handler(data[key])
 
 
 @socketio.on("sendYouTubePlaylist")
@@ -1239,15 +1592,16 @@ def receive_youtube_playlist(data):
         "total_videos": 10
     }
     """
-    global youtube_playlist_data
+    global youtube_playlist_data, _youtube_playlist_version
     if isinstance(data, dict):
+        _youtube_playlist_version += 1
         youtube_playlist_data["name"] = data.get("name", "")
         youtube_playlist_data["videos"] = data.get("videos", [])[:10]  # Limit to 10 for ESP memory
         youtube_playlist_data["current_index"] = data.get("current_index", 0)
         youtube_playlist_data["total_videos"] = data.get("total_videos", 0)
-        print(f"[RECEIVED YOUTUBE PLAYLIST]: {youtube_playlist_data['name']} ({youtube_playlist_data['total_videos']} videos)")
+        log.debug("[RECEIVED YOUTUBE PLAYLIST]: %s (%s videos)", youtube_playlist_data["name"], youtube_playlist_data["total_videos"])
     else:
-        print(f"[RECEIVED YOUTUBE PLAYLIST]: Invalid format - {type(data)}")
+        log.info("[RECEIVED YOUTUBE PLAYLIST]: Invalid format - %s", type(data))
 
 
 @socketio.on("sendYouTubePlaylistIndex")
@@ -1256,7 +1610,7 @@ def receive_youtube_playlist_index(data):
     global youtube_playlist_data
     try:
         youtube_playlist_data["current_index"] = int(data)
-        print(f"[RECEIVED YOUTUBE PLAYLIST INDEX]: {youtube_playlist_data['current_index']}")
+        log.debug("[RECEIVED YOUTUBE PLAYLIST INDEX]: %s", youtube_playlist_data["current_index"])
     except (ValueError, TypeError):
         pass
 
@@ -1273,7 +1627,30 @@ def system_info():
 def handle_request_system_info():
     """Client can emit 'request_system_info' to get a snapshot."""
     snapshot = get_system_snapshot()
-    socketio.emit("system_info", snapshot)
+    socketio.emit("system_info", _system_info_payload(snapshot))
+
+
+def _terminate_by_name(name):
+    """Terminate every process whose name matches (case-insensitive), except this server.
+    Returns the list of terminated PIDs.
+    """
+    killed = []
+    target = name.lower()
+    self_pid = os.getpid()
+    # process_iter() keeps its Process objects between calls, so only new PIDs pay
+    # for construction; no attrs, since calling name() directly skips as_dict()
+    for proc in psutil.process_iter():
+        try:
+            pname = proc.name()
+            if not pname or pname.lower() != target:
+                continue
+            if proc.pid == self_pid:
+                continue  # do not kill this server
+            proc.terminate()
+            killed.append(proc.pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return killed
 
 
 @app.route("/kill_process", methods=["POST"])
@@ -1313,19 +1690,8 @@ def kill_process():
             return jsonify({"error": str(e)}), 500
 
     # Kill by name (all matches, except this server process)
-    killed = []
     try:
-        for proc in psutil.process_iter(["pid", "name"]):
-            try:
-                if not proc.info["name"]:
-                    continue
-                if proc.info["name"].lower() == name.lower():
-                    if proc.pid == os.getpid():
-                        continue  # do not kill this server
-                    proc.terminate()
-                    killed.append(proc.info["pid"])
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        killed = _terminate_by_name(name)
 
         if not killed:
             return jsonify({"status": "no_matching_process"}), 404
@@ -1348,64 +1714,55 @@ def handle_kill_process_socket(data):
     pid = data.get("pid")
     name = data.get("name")
 
-    with app.test_request_context():
-        if pid is None and not name:
-            socketio.emit("kill_process_result", {"error": "pid or name required"})
-            return
-
-        if pid is not None:
-            try:
-                pid = int(pid)
-                proc = psutil.Process(pid)
-                proc_name = proc.name()
-                proc.terminate()
-                try:
-                    proc.wait(timeout=3)
-                    status = "terminated"
-                except psutil.TimeoutExpired:
-                    proc.kill()
-                    status = "killed"
-                socketio.emit("kill_process_result", {"status": status, "pid": pid, "name": proc_name})
-                return
-            except psutil.NoSuchProcess:
-                socketio.emit("kill_process_result", {"error": "process not found"})
-                return
-            except psutil.AccessDenied:
-                socketio.emit("kill_process_result", {"error": "access denied"})
-                return
-            except Exception as e:
-                socketio.emit("kill_process_result", {"error": str(e)})
-                return
+    if pid is None and not name:
+        socketio.emit("kill_process_result", {"error": "pid or name required"})
+        return
 
-        killed = []
+    if pid is not None:
         try:
-            for proc in psutil.process_iter(["pid", "name"]):
-                try:
-                    if not proc.info["name"]:
-                        continue
-                    if proc.info["name"].lower() == name.lower():
-                        if proc.pid == os.getpid():
-                            continue
-                        proc.terminate()
-                        killed.append(proc.info["pid"])
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-
-            if not killed:
-                socketio.emit("kill_process_result", {"status": "no_matching_process"})
-            else:
-                socketio.emit("kill_process_result", {"status": "terminated_by_name", "name": name, "pids": killed})
+            pid = int(pid)
+            proc = psutil.Process(pid)
+            proc_name = proc.name()
+            proc.terminate()
+            try:
+                proc.wait(timeout=3)
+                status = "terminated"
+            except psutil.TimeoutExpired:
+                proc.kill()
+                status = "killed"
+            socketio.emit("kill_process_result", {"status": status, "pid": pid, "name": proc_name})
+            return
+        except psutil.NoSuchProcess:
+            socketio.emit("kill_process_result", {"error": "process not found"})
+            return
+        except psutil.AccessDenied:
+            socketio.emit("kill_process_result", {"error": "access denied"})
+            return
         except Exception as e:
             socketio.emit("kill_process_result", {"error": str(e)})
+            return
+
+    try:
+        killed = _terminate_by_name(name)
+
+        if not killed:
+            socketio.emit("kill_process_result", {"status": "no_matching_process"})
+        else:
+            socketio.emit("kill_process_result", {"status": "terminated_by_name", "name": name, "pids": killed})
+    except Exception as e:
+        socketio.emit("kill_process_result", {"error": str(e)})
 # =======================================================
 
 
+_VALID_CMDS = frozenset(("play", "pause", "next", "previous"))
+
+
 @app.route("/send_command", methods=["POST"])
 def set_command():
     global pending_command
     data = request.json
     command = data.get("command")
-    if command in ["play", "pause", "next", "previous"]:
+    if command in _VALID_CMDS:
         print(f"[COMMAND SET BY USER]: {command}")
         pending_command = command
         return jsonify({"status": "command set", "command": command})
@@ -1426,7 +1783,7 @@ def get_command():
 def trigger_media():
     data = request.json or {}
     cmd = data.get("command")
-    if cmd not in ("play", "pause", "next", "previous"):
+    if cmd not in _VALID_CMDS:
         return jsonify({"error": "invalid command"}), 400
     # Try to run the media action locally
     if cmd in ("play", "pause"):
@@ -1486,8 +1843,8 @@ def auth_status():
         status["client_id"] = CLIENT_ID[:4] + "..." + CLIENT_ID[-4:]
     if os.path.exists("tokens.json"):
         try:
-            with open("tokens.json", "r") as f:
-                t = json.load(f)
+            # Served from the in-memory copy unless the file changed
+            t = load_tokens()
             status["tokens"] = True
             status["token_expires_in"] = t.get("expires_in")
             status["token_obtained_at"] = t.get("obtained_at")
@@ -1498,11 +1855,12 @@ def auth_status():
 
 
 def get_metadata():
+    s = _media_state
     return {
-        "title": title_data,
-        "artist": artist_data,
-        "album": album_data,
-        "artwork": artwork_data
+        "title": s.title,
+        "artist": s.artist,
+        "album": s.album,
+        "artwork": s.artwork
     }
 # Track last sent artwork URL to avoid redundant sends
 _last_artwork_url = None
@@ -1518,8 +1876,17 @@ _spotify_playback_cache = {
     "last_check": 0.0,
     "data": None,
     "last_track_uri": "",    # Track URI to detect song changes
+    "backoff": 0.0,          # Extra delay between polls after failed calls
 }
 _SPOTIFY_PLAYBACK_CHECK_TTL = 1.0  # seconds - faster updates for smooth progress
+_SPOTIFY_BACKOFF_MAX = 30.0  # cap for the poll backoff after errors / 429s
+_TOKEN_EXPIRY_MARGIN = 30  # treat the access token as expired this many seconds early
+
+
+def _spotify_poll_failed():
+    """Double the poll interval after a failed call (capped)."""
+    backoff = _spotify_playback_cache["backoff"]
+    _spotify_playback_cache["backoff"] = min(_SPOTIFY_BACKOFF_MAX, max(2 * backoff, 2.0))
 
 def _check_spotify_active() -> tuple:
     """
@@ -1532,17 +1899,27 @@ def _check_spotify_active() -> tuple:
     global _spotify_playback_cache
     now = time.time()
     
-    # Return cached result if fresh
-    if (now - _spotify_playback_cache["last_check"]) < _SPOTIFY_PLAYBACK_CHECK_TTL:
+    # Return cached result if fresh (the interval stretches while calls keep failing)
+    min_interval = max(_SPOTIFY_PLAYBACK_CHECK_TTL, _spotify_playback_cache["backoff"])
+    if (now - _spotify_playback_cache["last_check"]) < min_interval:
         return (_spotify_playback_cache["is_active"], _spotify_playback_cache["data"])
     
     # Query Spotify API for current playback state
     try:
-        from control_media import load_tokens, authorized_req
-        if authorized_req():
+        from control_media import authorized_req
+        tokens = load_tokens() if os.path.exists("tokens.json") else {}
+        expires_at = tokens.get("obtained_at", 0) + tokens.get("expires_in", 0)
+        # Trust the local expiry clock while the token is valid; only go through
+        # authorized_req() (which refreshes or re-auths) once it is about to expire.
+        token_ok = bool(tokens.get("access_token")) and now < expires_at - _TOKEN_EXPIRY_MARGIN
+        if not token_ok and authorized_req():
             tokens = load_tokens()
+            token_ok = True
+        if not token_ok:
+            _spotify_poll_failed()
+        else:
             access_token = tokens.get("access_token")
-            resp = requests.get(
+            resp = _http_poll.get(
                 "https://api.spotify.com/v1/me/player",
                 headers={"Authorization": f"Bearer {access_token}"},
                 timeout=2
@@ -1559,6 +1936,7 @@ def _check_spotify_active() -> tuple:
                 _spotify_playback_cache["is_playing"] = is_playing
                 _spotify_playback_cache["data"] = data if has_session else None
                 _spotify_playback_cache["last_check"] = now
+                _spotify_playback_cache["backoff"] = 0.0
                 
                 if has_session:
                     track_uri = item.get("uri", "")
@@ -1574,8 +1952,13 @@ def _check_spotify_active() -> tuple:
                 _spotify_playback_cache["is_playing"] = False
                 _spotify_playback_cache["data"] = None
                 _spotify_playback_cache["last_check"] = now
+                _spotify_playback_cache["backoff"] = 0.0
                 return (False, None)
+            else:
+                # 401/429/5xx - back off so errors don't turn into a poll storm
+                _spotify_poll_failed()
     except Exception as e:
+        _spotify_poll_failed()
         if SERIAL_DEBUG:
             print(f"[SPOTIFY CHECK] Error: {e}")
     
@@ -1583,6 +1966,56 @@ def _check_spotify_active() -> tuple:
     return (_spotify_playback_cache["is_active"], _spotify_playback_cache["data"])
 
 
+# ESP-formatted queue/playlist, rebuilt only when the queue manager reports a change
+_QMGR = get_queue_manager()
+_cached_queue_for_esp = {}
+
+
+def _refresh_cached_queue():
+    global _cached_queue_for_esp
+    _cached_queue_for_esp = _QMGR.queue_state.to_esp_dict(max_queue_items=5)
+
+
+_QMGR.on_change(_refresh_cached_queue)
+
+# Liked flag of the current Spotify track. /me/tracks/contains is asked again only when
+# the track changes, the TTL lapses, or a like/unlike command invalidates it.
+LIKED_CHECK_TTL = float(os.getenv("LIKED_CHECK_TTL", "15"))
+_liked_cache = {"uri": None, "value": False, "until": 0.0}
+
+
+def _is_liked(track_uri):
+    """Cached liked state of a Spotify track URI (False if the check fails)."""
+    c = _liked_cache
+    now = time.time()
+    if track_uri == c["uri"] and now < c["until"]:
+        return c["value"]
+    try:
+        liked = _QMGR.check_saved_tracks([track_uri])
+        value = liked[0] if liked else False
+    except Exception:
+        value = False
+    c["uri"] = track_uri
+    c["value"] = value
+    c["until"] = now + LIKED_CHECK_TTL
+    return value
+
+
+@app.route("/queue", methods=["GET"])
+def queue_for_esp():
+    """ESP-formatted queue/playlist. Clients that accept application/msgpack get the
+    binary encoding (raw thumbnail bytes, no base64); everyone else gets JSON."""
+    max_items = request.args.get("max_items", 10, type=int)
+    state = _QMGR.get_current_queue()
+    if HAS_MSGPACK and request.accept_mimetypes.best_match(["application/json", "application/msgpack"]) == "application/msgpack":
+        return Response(state.to_esp_msgpack(max_queue_items=max_items), mimetype="application/msgpack")
+    return jsonify(state.to_esp_dict(max_queue_items=max_items))
+
+# Last media snapshot and the inputs it was built from (compared by identity)
+_media_snapshot_cache = {"spotify": None, "state": None, "yt": -1, "liked": None, "queue": None,
+                         "until": 0.0, "art": False, "value": None}
+
+
 def get_media_snapshot():
     """
     Build a media snapshot from current metadata.
@@ -1590,13 +2023,57 @@ def get_media_snapshot():
     PRIORITY: Spotify takes precedence over browser media (YouTube, etc.) when Spotify
     has an active session (playing OR paused). This prevents reverting to old YouTube
     data when Spotify is paused.
-    """
-    global title_data, artist_data, album_data, artwork_data
-    global position_data, duration_data, is_playing_data, media_source
 
+    The result is memoized: the Spotify playback dict is replaced on each poll and the
+    browser state on each update, so unchanged inputs return the previous snapshot.
+    The liked flag and the ESP queue are looked up first (both cached) and are part
+    of the memo key.
+    """
+    global _last_seen_artwork_ts
     # Check if Spotify has an active session (playing OR paused)
     spotify_has_session, spotify_data = _check_spotify_active()
-    
+    s = _media_state
+
+    liked = None
+    queue_data = None
+    item = spotify_data.get("item") if spotify_has_session and spotify_data else None
+    if item:
+        track_uri = item.get("uri", "")
+        if track_uri:
+            liked = _is_liked(track_uri)
+        try:
+            # Refetches only once the manager's queue TTL lapses; a refetch fires
+            # the change callback that rebuilds _cached_queue_for_esp
+            _QMGR.get_current_queue()
+        except Exception as e:
+            if SERIAL_DEBUG:
+                print(f"[QUEUE] Error getting queue: {e}")
+        queue_data = _cached_queue_for_esp
+
+    c = _media_snapshot_cache
+    now = time.time()
+    if (c["value"] is not None and c["spotify"] is spotify_data and c["state"] is s
+            and c["yt"] == _youtube_playlist_version and c["liked"] == liked
+            and c["queue"] is queue_data and now < c["until"]):
+        if c["art"]:
+            # The browser artwork is still present, so keep its hold TTL running from now
+            _last_seen_artwork_ts = now
+        # Copy - the monitor loop pops artwork_url from the returned dict
+        return dict(c["value"])
+
+    c["until"] = float("inf")
+    c["art"] = False
+    media = _build_media_snapshot(spotify_has_session, spotify_data, s, liked, queue_data)
+    c["spotify"] = spotify_data
+    c["state"] = s
+    c["yt"] = _youtube_playlist_version
+    c["liked"] = liked
+    c["queue"] = queue_data
+    c["value"] = media
+    return dict(media) if media is not None else None
+
+
+def _build_media_snapshot(spotify_has_session, spotify_data, s, liked=None, queue_data=None):
     if spotify_has_session and spotify_data:
         # === SPOTIFY HAS ACTIVE SESSION - USE SPOTIFY DATA ===
         item = spotify_data.get("item", {})
@@ -1636,19 +2113,12 @@ def get_media_snapshot():
                 "track_uri": sp_track_uri,
             }
             
-            # Check if current track is liked (cached to avoid excessive API calls)
-            try:
-                queue_mgr = get_queue_manager()
-                if sp_track_uri:
-                    liked = queue_mgr.check_saved_tracks([sp_track_uri])
-                    media["is_liked"] = liked[0] if liked else False
-            except Exception:
-                media["is_liked"] = False
+            # Liked state of the current track (see _is_liked)
+            if liked is not None:
+                media["is_liked"] = liked
             
             # Add queue data for Spotify (limit to 5 items to save ESP32 memory)
             try:
-                queue_mgr = get_queue_manager()
-                queue_data = queue_mgr.get_queue_for_esp(max_items=5)
                 if queue_data.get("queue"):
                     media["queue"] = queue_data["queue"]
                 if queue_data.get("playlist"):
@@ -1662,31 +2132,22 @@ def get_media_snapshot():
     # === FALLBACK TO BROWSER EXTENSION DATA (YouTube, etc.) ===
     
     # If nothing is set yet, skip media entirely
-    if not title_data and not artist_data and not album_data and not artwork_data:
+    if not s.title and not s.artist and not s.album and not s.artwork:
         return None
 
     # Use browser extension data
-    position_sec = position_data
-    duration_sec = duration_data
-    is_playing = is_playing_data
-
     media = {
-        "title": title_data or "",
-        "artist": artist_data or "",
-        "album": album_data or "",
-        "position_seconds": position_sec,
-        "duration_seconds": duration_sec,
-        "is_playing": is_playing,
-        "source": media_source or "browser",
+        "title": s.title or "",
+        "artist": s.artist or "",
+        "album": s.album or "",
+        "position_seconds": s.position,
+        "duration_seconds": s.duration,
+        "is_playing": s.playing,
+        "source": s.source or "browser",
     }
 
-    # Extract artwork URL - artwork_data can be a URL string or {"src": url} object
-    artwork_url = None
-    if artwork_data:
-        if isinstance(artwork_data, dict) and "src" in artwork_data:
-            artwork_url = artwork_data["src"]
-        elif isinstance(artwork_data, str) and artwork_data.startswith("http"):
-            artwork_url = artwork_data
+    # Artwork URL is resolved in receive_artwork when the extension sends it
+    artwork_url = s.artwork_url
 
     # Stabilize artwork against brief transients: if artwork disappears only briefly,
     # keep last seen artwork until TTL expires so the ESP doesn't flicker or lose image.
@@ -1695,17 +2156,21 @@ def get_media_snapshot():
     if artwork_url:
         _last_seen_artwork_url = artwork_url
         _last_seen_artwork_ts = now_ts
+        # Memo hits on this snapshot keep refreshing the timestamp (see get_media_snapshot)
+        _media_snapshot_cache["art"] = True
     else:
         # If we have a last seen artwork and it's within TTL, use it instead
         if _last_seen_artwork_url and (now_ts - _last_seen_artwork_ts) <= _ARTWORK_TTL:
             artwork_url = _last_seen_artwork_url
+            # The output changes once the TTL lapses, so don't memoize past that point
+            _media_snapshot_cache["until"] = _last_seen_artwork_ts + _ARTWORK_TTL
     
     # Just indicate if artwork exists (actual image sent separately)
     media["has_artwork"] = artwork_url is not None
     media["artwork_url"] = artwork_url  # Store for separate image send
     
     # Add YouTube playlist data if source is YouTube and we have playlist data
-    if media_source == "youtube" and youtube_playlist_data.get("videos"):
+    if s.source == "youtube" and youtube_playlist_data.get("videos"):
         # Format playlist for ESP (similar to Spotify queue format)
         media["queue"] = []
         for video in youtube_playlist_data["videos"][:5]:  # Limit to 5 for ESP memory
@@ -1731,6 +2196,9 @@ def send_artwork_to_esp(url: str):
     Download image, convert to RGB565, and send to ESP in chunks.
     Sends as: IMG:<base64_chunk>\n
     Final chunk: IMG_END\n
+
+    Not called anywhere at the moment: the monitor loop sends artwork as the PNG
+    envelope built by artwork_fetch_worker.
     """
     global ser, _last_artwork_url
     
@@ -1768,13 +2236,11 @@ def send_artwork_to_esp(url: str):
                     except Exception:
                         pass
                 _serial_priority_queue.put({"type":"artwork_chunk","payload": line_bytes, "url": url}, block=False)
-            except Exception:
-                # If priority queue is full or multiple serial writes, fallback to direct write as last resort
-                try:
-                    ser.write(line_bytes)
-                    time.sleep(0.01)
-                except Exception:
-                    pass
+            except queue.Full:
+                # Never fall back to a direct ser.write here - it would block the
+                # calling request thread for the whole UART transfer
+                if SERIAL_DEBUG:
+                    print("[IMAGE] Priority queue full, dropping chunk")
         
         # Signal end of image - use priority queue
         try:
@@ -1786,11 +2252,9 @@ def send_artwork_to_esp(url: str):
                 except Exception:
                     pass
             _serial_priority_queue.put({"type":"artwork_chunk","payload": end_line, "url": url}, block=False)
-        except Exception:
-            try:
-                ser.write(b"IMG_END\n")
-            except Exception:
-                pass
+        except queue.Full:
+            if SERIAL_DEBUG:
+                print("[IMAGE] Priority queue full, dropping IMG_END")
         
         _last_artwork_url = url
         
@@ -1873,6 +2337,7 @@ if __name__ == "__main__":
     # === INITIALIZE TRANSPORT MANAGER ===
     transport_mgr = get_transport_manager()
     transport_mgr.debug = SERIAL_DEBUG
+    transport_mgr.wire_format = ESP_WIRE_FORMAT
     
     # Setup transports based on TRANSPORT_MODE
     if TRANSPORT_MODE in ("serial", "both"):
@@ -1880,7 +2345,8 @@ if __name__ == "__main__":
             print("[TRANSPORT] Serial disabled via DISABLE_AUTO_SERIAL")
         else:
             print(f"[TRANSPORT] Opening Serial {SERIAL_PORT} at {SERIAL_BAUD}...")
-            serial_transport = transport_mgr.add_serial(SERIAL_PORT, SERIAL_BAUD)
+            serial_transport = transport_mgr.add_serial(SERIAL_PORT, SERIAL_BAUD,
+                                                        write_timeout=SERIAL_WRITE_TIMEOUT)
             if serial_transport:
                 # Keep legacy 'ser' reference for backward compatibility
                 ser = serial_transport._serial
@@ -1935,7 +2401,14 @@ if __name__ == "__main__":
     # Start background system monitor (can be tuned: 0.05 = 20 Hz, 0.1 = 10 Hz)
     socketio.start_background_task(system_monitor_loop, 0.05)
 
-    print("[SERVER RUNNING] Flask-SocketIO on port 8080...")
+    if not ALLOW_UNSAFE_WERKZEUG:
+        print("[ERROR] The server runs on Werkzeug's development server (Flask-SocketIO threading mode).")
+        print("  It is meant for localhost/LAN use only. To run it, add to your `.env`:")
+        print("  ALLOW_UNSAFE_WERKZEUG=1")
+        raise SystemExit(1)
+
+    print("[SERVER RUNNING] Flask-SocketIO (Werkzeug, threading mode) on port 8080...")
     # IMPORTANT: no reloader, single process => only one serial owner
-    socketio.run(app, host="0.0.0.0", port=8080, debug=False, use_reloader=False)
+    socketio.run(app, host="0.0.0.0", port=8080, debug=False, use_reloader=False,
+                 allow_unsafe_werkzeug=ALLOW_UNSAFE_WERKZEUG)
   
\ No newline at end of file
@@ -9,14 +9,59 @@ This module handles:
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, ClassVar, Tuple
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
 import os
 import base64
+import hashlib
+import threading
+import importlib.util
+from collections import OrderedDict
 from io import BytesIO
 
+# Thumbnails are kept in memory (LRU) and on disk, keyed by sha1(size + URL)
+THUMB_CACHE_DIR = os.getenv(
+    "THUMB_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mediatracker", "thumbs")
+)
+_THUMB_CACHE_MAX = 256
+_THUMB_MAX_BYTES = 512 * 1024  # covers are ~40-80 KB; refuse anything absurdly larger
+
+# (connect, read) seconds: a dead route fails in 1 s and goes to the retry path
+# instead of eating the whole budget before the read even starts
+_HTTP_TIMEOUT = (1.0, 4.0)
+# Transient server errors retried by both HTTP paths (idempotent methods only, as urllib3 does)
+_RETRY_STATUSES = frozenset((500, 502, 503, 504))
+_RETRY_METHODS = frozenset(("GET", "PUT", "DELETE"))
+_RETRY_TOTAL = 2
+_RETRY_BACKOFF = 0.2
+
+# orjson parses/serializes several times faster than stdlib json; used when installed
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# msgpack gives a smaller, binary ESP payload (see QueueState.to_esp_msgpack)
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# httpx + h2 let all API calls multiplex over one HTTP/2 connection; requests is the fallback
+try:
+    import httpx
+    # httpx's http2=True needs h2; only check it's installed, it's imported lazily by httpx
+    HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+except ImportError:
+    HAS_HTTP2 = False
+
 # Try to import PIL for thumbnail processing
 try:
     from PIL import Image
@@ -26,7 +71,59 @@ except ImportError:
     print("[WARN] PIL not installed - playlist thumbnails disabled. Install with: pip install Pillow")
 
 
-@dataclass
+def _truncate(s: str, n: int) -> str:
+    """Clip a string to n chars, marking the cut with '..'."""
+    if not s:
+        return ""
+    if len(s) <= n:
+        return s
+    return s[:n-2] + ".."
+
+
+def _artists_str(artists: List[Dict[str, Any]], empty: str = "") -> str:
+    """Join the first two artist names (the ESP only has room for two)."""
+    n = len(artists)
+    if n == 0:
+        return empty
+    a0 = artists[0].get("name", "")
+    return a0 if n == 1 else a0 + ", " + artists[1].get("name", "")
+
+
+def _pick_image_urls(images: List[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+    """Pick (~60px, ~300px) image URLs from a Spotify images list in one pass.
+    Spotify lists sizes largest first (up to 3); with no size match, the smallest
+    image stands in for 60px and the largest for 300px."""
+    img_60 = img_300 = first = last = None
+    for img in images:
+        url = img.get("url")
+        if not url:
+            continue
+        if first is None:
+            first = url
+        last = url
+        w = img.get("width") or 0  # user-uploaded covers have no dimensions
+        h = img.get("height") or 0
+        if w <= 64 or h <= 64:
+            img_60 = url
+        elif w <= 320 or h <= 320 or not img_300:
+            img_300 = url
+    return img_60 or last, img_300 or first
+
+
+def _track_to_dict(t: "TrackItem", max_str_len: int = 48) -> Dict[str, Any]:
+    """ESP-friendly dict for a track (hot path of every queue refresh)."""
+    return {
+        "id": _truncate(t.track_id, 64),
+        "source": t.source,
+        "name": _truncate(t.name, max_str_len),
+        "artist": _truncate(t.artist, max_str_len),
+        "album": _truncate(t.album, max_str_len),
+        "duration_seconds": t.duration_sec,
+        "is_local": t.is_local
+    }
+
+
+@dataclass(slots=True)
 class TrackItem:
     """Represents a track in a playlist or queue."""
     track_id: str               # Spotify track URI or local URI
@@ -46,23 +143,10 @@ class TrackItem:
 
     def to_esp_dict(self, max_str_len: int = 48) -> Dict[str, Any]:
         """Convert to ESP-friendly dictionary with truncated strings."""
-        def truncate(s: str, n: int) -> str:
-            if not s:
-                return ""
-            return s[:n] if len(s) <= n else s[:n-2] + ".."
-        
-        return {
-            "id": truncate(self.track_id, 64),
-            "source": self.source,
-            "name": truncate(self.name, max_str_len),
-            "artist": truncate(self.artist, max_str_len),
-            "album": truncate(self.album, max_str_len),
-            "duration_seconds": self.duration_sec,
-            "is_local": self.is_local
-        }
+        return _track_to_dict(self, max_str_len)
 
 
-@dataclass
+@dataclass(slots=True)
 class SpotifyPlaylistContext:
     """Represents playlist metadata."""
     playlist_id: str
@@ -75,23 +159,26 @@ class SpotifyPlaylistContext:
     image_url_60: Optional[str] = None
     image_url_300: Optional[str] = None
     thumb_b64: Optional[str] = None  # Preprocessed 60x60 JPEG base64
+    # Last to_esp_dict output and the field values it was built from
+    _esp_key: Optional[tuple] = field(default=None, repr=False, compare=False)
+    _esp_dict: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
 
     def to_esp_dict(self, max_str_len: int = 48) -> Dict[str, Any]:
-        """Convert to ESP-friendly dictionary."""
-        def truncate(s: str, n: int) -> str:
-            if not s:
-                return ""
-            return s[:n] if len(s) <= n else s[:n-2] + ".."
-        
-        return {
-            "id": self.playlist_id,
-            "name": truncate(self.name, max_str_len),
-            "is_public": self.is_public,
-            "is_collaborative": self.is_collaborative,
-            "total_tracks": self.total_tracks,
-            "snapshot_id": self.snapshot_id,
-            "image_thumb_jpg_b64": self.thumb_b64 or ""
-        }
+        """Convert to ESP-friendly dictionary (memoized until a field changes; don't mutate it)."""
+        key = (self.snapshot_id, self.name, self.is_public, self.is_collaborative,
+               self.total_tracks, self.thumb_b64, max_str_len)
+        if key != self._esp_key:
+            self._esp_dict = {
+                "id": self.playlist_id,
+                "name": _truncate(self.name, max_str_len),
+                "is_public": self.is_public,
+                "is_collaborative": self.is_collaborative,
+                "total_tracks": self.total_tracks,
+                "snapshot_id": self.snapshot_id,
+                "image_thumb_jpg_b64": self.thumb_b64 or ""
+            }
+            self._esp_key = key
+        return self._esp_dict
 
 
 @dataclass
@@ -111,10 +198,37 @@ class QueueState:
         
         # Limit queue items for ESP memory
         queue_items = self.up_next[:max_queue_items]
-        result["queue"] = [t.to_esp_dict() for t in queue_items]
+        result["queue"] = [_track_to_dict(t) for t in queue_items]
         
         return result
 
+    def to_esp_msgpack(self, max_queue_items: int = 10) -> bytes:
+        """Same payload as to_esp_dict, msgpack-encoded; the playlist thumbnail is sent
+        as raw JPEG bytes ("image_thumb_jpg") instead of base64. Requires msgpack."""
+        result = self.to_esp_dict(max_queue_items)
+        playlist = result.get("playlist")
+        if playlist is not None:
+            playlist = result["playlist"] = dict(playlist)  # the context memoizes its dict
+            thumb_b64 = playlist.pop("image_thumb_jpg_b64", "")
+            playlist["image_thumb_jpg"] = base64.b64decode(thumb_b64) if thumb_b64 else b""
+        return msgpack.packb(result, use_bin_type=True)
+
+
+def _json_loads(raw):
+    """Parse a JSON document (bytes or str)."""
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+
+
+def _request_kwargs(token: str, json_body: Optional[Any] = None) -> Dict[str, Any]:
+    """Auth header plus JSON body for a requests call (body pre-encoded with orjson if available)."""
+    headers = {"Authorization": f"Bearer {token}"}
+    if json_body is None:
+        return {"headers": headers}
+    if HAS_ORJSON:
+        headers["Content-Type"] = "application/json"
+        return {"headers": headers, "data": orjson.dumps(json_body)}
+    return {"headers": headers, "json": json_body}
+
 
 class SpotifyQueueManager:
     """Manages Spotify playlists and queue for ESP32 display."""
@@ -138,33 +252,128 @@ class SpotifyQueueManager:
         "user-library-read",
     ]
     
+    # Joined once at import; the auth URL builder just returns it
+    ALL_SCOPES_STR: ClassVar[str] = " ".join(REQUIRED_SCOPES + OPTIONAL_SCOPES)
+    
     def __init__(self, tokens_path: str = "tokens.json"):
         self.tokens_path = tokens_path
         self.queue_state = QueueState()
         self._playlists_cache: List[SpotifyPlaylistContext] = []
         self._playlists_cache_time: float = 0.0
+        # Same objects as _playlists_cache, by ID, so single-playlist updates land in the list
+        self._playlists_by_id: Dict[str, SpotifyPlaylistContext] = {}
         self._queue_cache_time: float = 0.0
         self._CACHE_TTL = 5.0  # seconds
         self._PLAYLIST_CACHE_TTL = 60.0  # seconds
+        self._change_callbacks: List[Callable[[], None]] = []
+        self._base = "https://api.spotify.com/v1"
+        # Parsed tokens.json, reused until the file's mtime changes
+        self._token_cache: Optional[Dict] = None
+        self._token_mtime: int = 0
+        # Thumbnail GET + resize runs off the caller's thread (the session is shared)
+        self._thumb_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumb")
+        self._thumb_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._thumb_lock = threading.Lock()
+        # Refreshes currently on the wire, keyed by what they fetch (see _single_flight)
+        self._inflight: Dict[Any, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # One pooled session so the many small API calls per ESP refresh reuse TCP+TLS
+        # connections. 429 isn't retried here: honouring Retry-After would block the caller.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4, pool_maxsize=16,
+            max_retries=Retry(total=_RETRY_TOTAL, connect=2, read=1, backoff_factor=_RETRY_BACKOFF,
+                              status_forcelist=_RETRY_STATUSES)
+        ))
+        # API calls prefer a single multiplexed HTTP/2 connection (thumbnails stay on the session)
+        self._h2 = None
+        if HAS_HTTP2:
+            self._h2 = httpx.Client(
+                base_url=self._base,
+                timeout=httpx.Timeout(_HTTP_TIMEOUT[1], connect=_HTTP_TIMEOUT[0]),
+                transport=httpx.HTTPTransport(
+                    http2=True, retries=2,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8)
+                )
+            )
+    
+    def on_change(self, callback: Callable[[], None]) -> None:
+        """Register a callback run whenever queue_state is updated."""
+        self._change_callbacks.append(callback)
+    
+    def _notify_change(self) -> None:
+        for callback in self._change_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[QUEUE] Change callback error: {e}")
     
     def _load_tokens(self) -> Optional[Dict]:
-        """Load tokens from file."""
-        if not os.path.exists(self.tokens_path):
+        """Load tokens from file (cached until the file changes)."""
+        try:
+            mtime = os.stat(self.tokens_path).st_mtime_ns
+        except OSError:
             return None
+        if self._token_cache is not None and mtime == self._token_mtime:
+            return self._token_cache
         try:
-            with open(self.tokens_path, "r") as f:
-                return json.load(f)
+            with open(self.tokens_path, "rb") as f:
+                self._token_cache = _json_loads(f.read())
+            self._token_mtime = mtime
+            return self._token_cache
         except Exception as e:
             print(f"[QUEUE] Error loading tokens: {e}")
             return None
     
     def _get_access_token(self) -> Optional[str]:
         """Get current access token."""
+        # A cached token that isn't close to expiry needs no filesystem check at all
+        tokens = self._token_cache
+        if tokens and tokens.get("obtained_at", 0) + tokens.get("expires_in", 0) > time.time() + 30:
+            return tokens.get("access_token")
         tokens = self._load_tokens()
         if not tokens:
             return None
         return tokens.get("access_token")
     
+    def _send(self, method: str, endpoint: str, **kwargs):
+        """Send an API request over HTTP/2 when available, otherwise via the requests session.
+
+        httpx's transport retries only failed connects, so 5xx responses are retried
+        here to match the session's urllib3 Retry policy.
+        """
+        if self._h2 is not None:
+            if isinstance(kwargs.get("data"), bytes):
+                kwargs["content"] = kwargs.pop("data")
+            retries = _RETRY_TOTAL if method.upper() in _RETRY_METHODS else 0
+            for attempt in range(retries + 1):
+                resp = self._h2.request(method, endpoint, **kwargs)
+                if resp.status_code not in _RETRY_STATUSES or attempt == retries:
+                    return resp
+                resp.close()
+                time.sleep(_RETRY_BACKOFF * (2 ** attempt))
+        return self._session.request(method, f"{self._base}{endpoint}", timeout=_HTTP_TIMEOUT, **kwargs)
+    
+    def _single_flight(self, key: Any, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) unless the same refresh is already running; then wait for its result."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
     def _api_get(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """Make a GET request to Spotify API."""
         token = self._get_access_token()
@@ -173,14 +382,13 @@ class SpotifyQueueManager:
             return None
         
         try:
-            resp = requests.get(
-                f"https://api.spotify.com/v1{endpoint}",
+            resp = self._send(
+                "GET", endpoint,
                 headers={"Authorization": f"Bearer {token}"},
-                params=params,
-                timeout=5
+                params=params
             )
             if resp.status_code == 200:
-                return resp.json()
+                return _json_loads(resp.content)
             elif resp.status_code == 204:
                 return {}  # No content but success
             else:
@@ -190,22 +398,21 @@ class SpotifyQueueManager:
             print(f"[QUEUE] API exception: {e}")
             return None
     
-    def _api_post(self, endpoint: str, data: Optional[Dict] = None, json_body: Optional[Dict] = None) -> Optional[Dict]:
+    def _api_post(self, endpoint: str, data: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                  params: Optional[Dict] = None) -> Optional[Dict]:
         """Make a POST request to Spotify API."""
         token = self._get_access_token()
         if not token:
             return None
         
         try:
-            resp = requests.post(
-                f"https://api.spotify.com/v1{endpoint}",
-                headers={"Authorization": f"Bearer {token}"},
-                data=data,
-                json=json_body,
-                timeout=5
-            )
+            if data is not None:
+                kwargs = {"headers": {"Authorization": f"Bearer {token}"}, "data": data}
+            else:
+                kwargs = _request_kwargs(token, json_body)
+            resp = self._send("POST", endpoint, params=params, **kwargs)
             if resp.status_code in (200, 201, 204):
-                return resp.json() if resp.content else {}
+                return _json_loads(resp.content) if resp.content else {}
             else:
                 print(f"[QUEUE] POST error {resp.status_code}: {resp.text[:100]}")
                 return None
@@ -215,58 +422,116 @@ class SpotifyQueueManager:
     
     def _api_put(self, endpoint: str, json_body: Optional[Dict] = None, params: Optional[Dict] = None) -> bool:
         """Make a PUT request to Spotify API."""
+        return self._api_put_json(endpoint, json_body, params)[0]
+    
+    def _api_put_json(self, endpoint: str, json_body: Optional[Dict] = None,
+                      params: Optional[Dict] = None) -> Tuple[bool, Dict]:
+        """PUT to Spotify API, returning (ok, parsed response body)."""
         token = self._get_access_token()
         if not token:
-            return False
+            return False, {}
         
         try:
-            resp = requests.put(
-                f"https://api.spotify.com/v1{endpoint}",
-                headers={"Authorization": f"Bearer {token}"},
-                json=json_body,
-                params=params,
-                timeout=5
-            )
-            return resp.status_code in (200, 202, 204)
+            resp = self._send("PUT", endpoint, params=params, **_request_kwargs(token, json_body))
+            if resp.status_code in (200, 202, 204):
+                return True, (_json_loads(resp.content) if resp.content else {})
+            print(f"[QUEUE] PUT error {resp.status_code}: {resp.text[:100]}")
+            return False, {}
         except Exception as e:
             print(f"[QUEUE] PUT exception: {e}")
-            return False
+            return False, {}
     
-    def _api_delete(self, endpoint: str, json_body: Optional[Dict] = None) -> bool:
+    def _api_delete(self, endpoint: str, json_body: Optional[Dict] = None, params: Optional[Dict] = None) -> bool:
         """Make a DELETE request to Spotify API."""
+        return self._api_delete_json(endpoint, json_body, params)[0]
+    
+    def _api_delete_json(self, endpoint: str, json_body: Optional[Dict] = None,
+                         params: Optional[Dict] = None) -> Tuple[bool, Dict]:
+        """DELETE on Spotify API, returning (ok, parsed response body)."""
         token = self._get_access_token()
         if not token:
-            return False
+            return False, {}
         
         try:
-            resp = requests.delete(
-                f"https://api.spotify.com/v1{endpoint}",
-                headers={"Authorization": f"Bearer {token}"},
-                json=json_body,
-                timeout=5
-            )
-            return resp.status_code in (200, 204)
+            resp = self._send("DELETE", endpoint, params=params, **_request_kwargs(token, json_body))
+            if resp.status_code in (200, 204):
+                return True, (_json_loads(resp.content) if resp.content else {})
+            print(f"[QUEUE] DELETE error {resp.status_code}: {resp.text[:100]}")
+            return False, {}
         except Exception as e:
             print(f"[QUEUE] DELETE exception: {e}")
-            return False
+            return False, {}
+    
+    def _thumb_cache_get(self, key: str) -> Optional[str]:
+        with self._thumb_lock:
+            b64 = self._thumb_cache.get(key)
+            if b64 is not None:
+                self._thumb_cache.move_to_end(key)
+                return b64
+        try:
+            with open(os.path.join(THUMB_CACHE_DIR, key + ".b64"), "r") as f:
+                b64 = f.read()
+        except OSError:
+            return None
+        self._thumb_cache_put(key, b64, persist=False)
+        return b64
+    
+    def _thumb_cache_put(self, key: str, b64: str, persist: bool = True) -> None:
+        with self._thumb_lock:
+            self._thumb_cache[key] = b64
+            self._thumb_cache.move_to_end(key)
+            if len(self._thumb_cache) > _THUMB_CACHE_MAX:
+                self._thumb_cache.popitem(last=False)
+        if not persist:
+            return
+        try:
+            os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+            path = os.path.join(THUMB_CACHE_DIR, key + ".b64")
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(b64)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[QUEUE] Thumbnail cache write error: {e}")
     
     def _download_thumbnail(self, url: str, size: int = 60) -> Optional[str]:
-        """Download and resize image to small JPEG base64."""
+        """Download and resize image to small JPEG base64 (cached by URL)."""
         if not HAS_PIL or not url:
             return None
         
+        key = hashlib.sha1(f"{size}:{url}".encode()).hexdigest()
+        cached = self._thumb_cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            resp = requests.get(url, timeout=5)
-            if resp.status_code != 200:
-                return None
+            # Stream into one buffer with a size cap instead of letting requests
+            # buffer an unbounded body (and then copying it again into BytesIO)
+            with self._session.get(url, timeout=_HTTP_TIMEOUT, stream=True) as resp:
+                if resp.status_code != 200:
+                    return None
+                raw = BytesIO()
+                for part in resp.iter_content(chunk_size=16 * 1024):
+                    raw.write(part)
+                    if raw.tell() > _THUMB_MAX_BYTES:
+                        print(f"[QUEUE] Thumbnail too large, skipping: {url[:60]}")
+                        return None
+            raw.seek(0)
             
-            img = Image.open(BytesIO(resp.content))
+            img = Image.open(raw)
+            # Let libjpeg downscale in the DCT domain while decoding (no-op for non-JPEGs);
+            # 2x headroom keeps the final resample clean
+            img.draft("RGB", (size * 2, size * 2))
             img = img.convert("RGB")
-            img = img.resize((size, size), Image.Resampling.LANCZOS)
+            # BILINEAR is indistinguishable from LANCZOS at 60x60 and much cheaper.
+            # resize (not thumbnail) so the ESP always gets exactly size x size.
+            img = img.resize((size, size), Image.Resampling.BILINEAR)
             
             buf = BytesIO()
-            img.save(buf, format="JPEG", quality=60)
-            return base64.b64encode(buf.getvalue()).decode("ascii")
+            img.save(buf, format="JPEG", quality=60, optimize=True, progressive=False)
+            b64 = base64.b64encode(buf.getvalue()).decode("ascii")
+            self._thumb_cache_put(key, b64)
+            return b64
         except Exception as e:
             print(f"[QUEUE] Thumbnail error: {e}")
             return None
@@ -279,53 +544,38 @@ class SpotifyQueueManager:
         now = time.time()
         if not force_refresh and self._playlists_cache and (now - self._playlists_cache_time) < self._PLAYLIST_CACHE_TTL:
             return self._playlists_cache
-        
+        return self._single_flight(("playlists", limit), self._refresh_playlists, limit, now)
+    
+    def _refresh_playlists(self, limit: int, now: float) -> List[SpotifyPlaylistContext]:
         data = self._api_get("/me/playlists", {"limit": limit})
         if not data or "items" not in data:
             return self._playlists_cache  # Return stale cache on error
         
         playlists = []
+        by_id = {}
         for item in data["items"]:
             if not item:
                 continue
+            g = item.get
+            img_60, img_300 = _pick_image_urls(g("images") or [])
             
-            # Get images (Spotify provides up to 3 sizes)
-            images = item.get("images", [])
-            img_60 = None
-            img_300 = None
-            for img in images:
-                w = img.get("width") or 0
-                h = img.get("height") or 0
-                url = img.get("url")
-                if not url:
-                    continue
-                if w <= 64 or h <= 64:
-                    img_60 = url
-                elif w <= 320 or h <= 320:
-                    img_300 = url
-                elif not img_300:
-                    img_300 = url
-            
-            # Use first image as fallback
-            if not img_60 and images:
-                img_60 = images[-1].get("url") if len(images) > 0 else None
-            if not img_300 and images:
-                img_300 = images[0].get("url") if len(images) > 0 else None
-            
+            # Every field comes from the fresh list item: _apply_snapshot pre-writes the
+            # snapshot_id after an edit, so a matching snapshot doesn't mean the count,
+            # owner or images on the cached entry are current
             pl = SpotifyPlaylistContext(
-                playlist_id=item.get("id", ""),
-                name=item.get("name", "Untitled"),
-                is_public=item.get("public", False) or False,
-                is_collaborative=item.get("collaborative", False) or False,
-                owner_id=item.get("owner", {}).get("id", ""),
-                snapshot_id=item.get("snapshot_id", ""),
-                total_tracks=item.get("tracks", {}).get("total", 0),
-                image_url_60=img_60,
-                image_url_300=img_300
+                g("id", ""), g("name", "Untitled"), bool(g("public")), bool(g("collaborative")),
+                (g("owner") or {}).get("id", ""), g("snapshot_id", ""),
+                (g("tracks") or {}).get("total", 0), img_60, img_300
             )
+            # An unchanged playlist keeps the thumbnail already attached to its cached entry
+            cached = self._playlists_by_id.get(pl.playlist_id)
+            if cached and cached.snapshot_id == pl.snapshot_id and cached.image_url_60 == img_60:
+                pl.thumb_b64 = cached.thumb_b64
             playlists.append(pl)
+            by_id[pl.playlist_id] = pl
         
         self._playlists_cache = playlists
+        self._playlists_by_id = by_id
         self._playlists_cache_time = now
         return playlists
     
@@ -341,42 +591,54 @@ class SpotifyQueueManager:
             return []
         
         tracks = []
-        for idx, item in enumerate(data["items"]):
+        append = tracks.append
+        TI = TrackItem
+        for idx, item in enumerate(data["items"], start=offset):
             track = item.get("track")
             if not track:
                 continue
             
-            is_local = track.get("is_local", False)
-            uri = track.get("uri", "")
+            tg = track.get
+            is_local = tg("is_local", False)
+            uri = tg("uri", "")
             
             # Build artist string
-            artists = track.get("artists", [])
-            artist_str = ", ".join(a.get("name", "") for a in artists[:2]) if artists else "Unknown"
+            artists = tg("artists", [])
+            artist_str = _artists_str(artists, "Unknown")
             
             # Album info
-            album = track.get("album", {})
+            album = tg("album", {})
             album_name = album.get("name", "")
             
             # Get album image
             images = album.get("images", [])
             img_url = images[-1].get("url") if images else None
             
-            t = TrackItem(
-                track_id=uri,
-                source="local" if is_local else "spotify",
-                name=track.get("name", "Unknown"),
-                artist=artist_str,
-                album=album_name,
-                duration_sec=track.get("duration_ms", 0) // 1000,
-                is_local=is_local,
-                playlist_index=offset + idx,
-                playlist_id=playlist_id,
-                image_url=img_url
-            )
-            tracks.append(t)
-        
+            append(TI(
+                uri, "local" if is_local else "spotify", tg("name", "Unknown"),
+                artist_str, album_name, tg("duration_ms", 0) // 1000, is_local,
+                idx, playlist_id, image_url=img_url
+            ))
+
         return tracks
-    
+
+    def get_playlist_tracks_all(self, playlist_id: str, page_size: int = 50) -> List[TrackItem]:
+        """Get every track in a playlist, fetching the pages concurrently."""
+        data = self._api_get(f"/playlists/{playlist_id}/tracks", {"limit": 1, "fields": "total"})
+        if not data:
+            return []
+        total = data.get("total", 0)
+
+        # Pages share self._session, so keep-alive connections are reused
+        futures = [
+            self._thumb_pool.submit(self.get_playlist_tracks, playlist_id, page_size, off)
+            for off in range(0, total, page_size)
+        ]
+        tracks = []
+        for f in futures:  # Submission order == offset order
+            tracks.extend(f.result())
+        return tracks
+
     def get_current_queue(self, force_refresh: bool = False) -> QueueState:
         """
         Get current playback queue from Spotify.
@@ -385,7 +647,9 @@ class SpotifyQueueManager:
         now = time.time()
         if not force_refresh and (now - self._queue_cache_time) < self._CACHE_TTL:
             return self.queue_state
-        
+        return self._single_flight("queue", self._refresh_queue, now)
+    
+    def _refresh_queue(self, now: float) -> QueueState:
         # Get queue from Spotify
         data = self._api_get("/me/player/queue")
         if not data:
@@ -397,7 +661,7 @@ class SpotifyQueueManager:
         if current and current.get("type") == "track":
             is_local = current.get("is_local", False)
             artists = current.get("artists", [])
-            artist_str = ", ".join(a.get("name", "") for a in artists[:2]) if artists else ""
+            artist_str = _artists_str(artists)
             album = current.get("album", {})
             images = album.get("images", [])
             
@@ -414,32 +678,30 @@ class SpotifyQueueManager:
         
         # Parse queue
         queue_items = []
+        append = queue_items.append
+        TI = TrackItem
         for item in data.get("queue", [])[:20]:  # Limit to 20 items
-            if item.get("type") != "track":
+            ig = item.get
+            if ig("type") != "track":
                 continue
             
-            is_local = item.get("is_local", False)
-            artists = item.get("artists", [])
-            artist_str = ", ".join(a.get("name", "") for a in artists[:2]) if artists else ""
-            album = item.get("album", {})
+            is_local = ig("is_local", False)
+            artists = ig("artists", [])
+            artist_str = _artists_str(artists)
+            album = ig("album", {})
             images = album.get("images", [])
             
-            t = TrackItem(
-                track_id=item.get("uri", ""),
-                source="local" if is_local else "spotify",
-                name=item.get("name", ""),
-                artist=artist_str,
-                album=album.get("name", ""),
-                duration_sec=item.get("duration_ms", 0) // 1000,
-                is_local=is_local,
+            append(TI(
+                ig("uri", ""), "local" if is_local else "spotify", ig("name", ""),
+                artist_str, album.get("name", ""), ig("duration_ms", 0) // 1000, is_local,
                 image_url=images[-1].get("url") if images else None
-            )
-            queue_items.append(t)
+            ))
         
         self.queue_state.current_track = current_track
         self.queue_state.up_next = queue_items
         self.queue_state.last_updated = now
         self._queue_cache_time = now
+        self._notify_change()
         
         return self.queue_state
     
@@ -453,40 +715,45 @@ class SpotifyQueueManager:
         if not data:
             return False
         
-        images = data.get("images", [])
-        img_60 = None
-        img_300 = None
-        for img in images:
-            w = img.get("width") or 640
-            url = img.get("url")
-            if w <= 64:
-                img_60 = url
-            elif w <= 320:
-                img_300 = url
-        
-        if not img_60 and images:
-            img_60 = images[-1].get("url")
-        if not img_300 and images:
-            img_300 = images[0].get("url")
-        
-        # Download thumbnail
-        thumb_b64 = self._download_thumbnail(img_60 or img_300, size=60) if (img_60 or img_300) else None
+        g = data.get
+        img_60, img_300 = _pick_image_urls(g("images") or [])
         
         self.queue_state.playlist_context = SpotifyPlaylistContext(
-            playlist_id=data.get("id", playlist_id),
-            name=data.get("name", "Playlist"),
-            is_public=data.get("public", False) or False,
-            is_collaborative=data.get("collaborative", False) or False,
-            owner_id=data.get("owner", {}).get("id", ""),
-            snapshot_id=data.get("snapshot_id", ""),
-            total_tracks=data.get("tracks", {}).get("total", 0),
-            image_url_60=img_60,
-            image_url_300=img_300,
-            thumb_b64=thumb_b64
+            g("id", playlist_id), g("name", "Playlist"), bool(g("public")), bool(g("collaborative")),
+            (g("owner") or {}).get("id", ""), g("snapshot_id", ""),
+            (g("tracks") or {}).get("total", 0), img_60, img_300
         )
+        self._update_cached_playlist(self.queue_state.playlist_context)
+        self._notify_change()
+        
+        # Download the thumbnail in the background; it's attached (and listeners
+        # notified again) when ready, so the caller doesn't wait on the image GET
+        thumb_url = img_60 or img_300
+        if thumb_url:
+            context = self.queue_state.playlist_context
+            future = self._thumb_pool.submit(self._download_thumbnail, thumb_url, 60)
+            future.add_done_callback(lambda f: self._attach_thumbnail(context, f))
         
         return True
     
+    def _update_cached_playlist(self, fresh: "SpotifyPlaylistContext") -> None:
+        """Copy freshly fetched metadata into the playlists cache entry, if there is one."""
+        cached = self._playlists_by_id.get(fresh.playlist_id)
+        if cached is None or cached is fresh:
+            return
+        cached.name = fresh.name
+        cached.is_public = fresh.is_public
+        cached.is_collaborative = fresh.is_collaborative
+        cached.snapshot_id = fresh.snapshot_id
+        cached.total_tracks = fresh.total_tracks
+    
+    def _attach_thumbnail(self, context: "SpotifyPlaylistContext", future) -> None:
+        thumb_b64 = future.result()
+        # Ignore it if another playlist became active meanwhile
+        if thumb_b64 and self.queue_state.playlist_context is context:
+            context.thumb_b64 = thumb_b64
+            self._notify_change()
+    
     # ========== PLAYBACK CONTROL ==========
     
     def play_track(self, track_uri: str, context_uri: Optional[str] = None) -> bool:
@@ -505,7 +772,7 @@ class SpotifyQueueManager:
     
     def add_to_queue(self, track_uri: str) -> bool:
         """Add a track to the playback queue."""
-        return self._api_post(f"/me/player/queue?uri={track_uri}") is not None
+        return self._api_post("/me/player/queue", params={"uri": track_uri}) is not None
     
     def skip_to_next(self) -> bool:
         """Skip to next track."""
@@ -517,7 +784,7 @@ class SpotifyQueueManager:
     
     def set_shuffle(self, state: bool) -> bool:
         """Set shuffle mode on/off."""
-        return self._api_put(f"/me/player/shuffle?state={'true' if state else 'false'}")
+        return self._api_put("/me/player/shuffle", params={"state": "true" if state else "false"})
     
     def set_repeat(self, state: str) -> bool:
         """
@@ -526,7 +793,7 @@ class SpotifyQueueManager:
         """
         if state not in ("track", "context", "off"):
             state = "off"
-        return self._api_put(f"/me/player/repeat?state={state}")
+        return self._api_put("/me/player/repeat", params={"state": state})
     
     def check_saved_tracks(self, track_ids: list) -> list:
         """Check if tracks are saved in user's library. Returns list of booleans."""
@@ -541,8 +808,21 @@ class SpotifyQueueManager:
         if not ids:
             return []
         
-        data = self._api_get("/me/tracks/contains", {"ids": ",".join(ids[:50])})  # Max 50
-        return data if isinstance(data, list) else []
+        # The endpoint takes at most 50 IDs; larger lists are split and fetched in parallel
+        chunks = [ids[i:i + 50] for i in range(0, len(ids), 50)]
+        if len(chunks) == 1:
+            data = self._api_get("/me/tracks/contains", {"ids": ",".join(ids)})
+            return data if isinstance(data, list) else []
+        
+        futures = [
+            self._thumb_pool.submit(self._api_get, "/me/tracks/contains", {"ids": ",".join(c)})
+            for c in chunks
+        ]
+        result = []
+        for c, f in zip(chunks, futures):
+            data = f.result()
+            result.extend(data if isinstance(data, list) else [False] * len(c))
+        return result
     
     # ========== PLAYLIST MODIFICATION ==========
     
@@ -557,29 +837,10 @@ class SpotifyQueueManager:
         if snapshot_id:
             body["snapshot_id"] = snapshot_id
         
-        token = self._get_access_token()
-        if not token:
-            return None
-        
-        try:
-            resp = requests.delete(
-                f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-                headers={"Authorization": f"Bearer {token}"},
-                json=body,
-                timeout=5
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                new_snapshot = data.get("snapshot_id")
-                if self.queue_state.playlist_context and self.queue_state.playlist_context.playlist_id == playlist_id:
-                    self.queue_state.playlist_context.snapshot_id = new_snapshot
-                return new_snapshot
-            else:
-                print(f"[QUEUE] Remove track error: {resp.status_code}")
-                return None
-        except Exception as e:
-            print(f"[QUEUE] Remove track exception: {e}")
+        ok, data = self._api_delete_json(f"/playlists/{playlist_id}/tracks", json_body=body)
+        if not ok:
             return None
+        return self._apply_snapshot(playlist_id, data.get("snapshot_id"))
     
     def reorder_playlist_tracks(self, playlist_id: str, range_start: int, insert_before: int,
                                  range_length: int = 1, snapshot_id: Optional[str] = None) -> Optional[str]:
@@ -595,29 +856,21 @@ class SpotifyQueueManager:
         if snapshot_id:
             body["snapshot_id"] = snapshot_id
         
-        token = self._get_access_token()
-        if not token:
-            return None
-        
-        try:
-            resp = requests.put(
-                f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-                headers={"Authorization": f"Bearer {token}"},
-                json=body,
-                timeout=5
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                new_snapshot = data.get("snapshot_id")
-                if self.queue_state.playlist_context and self.queue_state.playlist_context.playlist_id == playlist_id:
-                    self.queue_state.playlist_context.snapshot_id = new_snapshot
-                return new_snapshot
-            else:
-                print(f"[QUEUE] Reorder error: {resp.status_code}")
-                return None
-        except Exception as e:
-            print(f"[QUEUE] Reorder exception: {e}")
+        ok, data = self._api_put_json(f"/playlists/{playlist_id}/tracks", json_body=body)
+        if not ok:
             return None
+        return self._apply_snapshot(playlist_id, data.get("snapshot_id"))
+    
+    def _apply_snapshot(self, playlist_id: str, new_snapshot: Optional[str]) -> Optional[str]:
+        """Record a playlist's new snapshot_id if it's the active context."""
+        cached = self._playlists_by_id.get(playlist_id)
+        if cached is not None:
+            cached.snapshot_id = new_snapshot
+        ctx = self.queue_state.playlist_context
+        if ctx and ctx.playlist_id == playlist_id:
+            ctx.snapshot_id = new_snapshot
+            self._notify_change()
+        return new_snapshot
     
     # ========== PLAYLIST FOLLOW/UNFOLLOW ==========
     
@@ -642,7 +895,7 @@ class SpotifyQueueManager:
         """Remove a track from user's library."""
         if track_id.startswith("spotify:track:"):
             track_id = track_id.split(":")[-1]
-        return self._api_delete(f"/me/tracks?ids={track_id}")
+        return self._api_delete("/me/tracks", params={"ids": track_id})
     
     def add_to_playlist(self, playlist_id: str, track_uris: List[str]) -> bool:
         """Add tracks to a playlist.
@@ -672,18 +925,19 @@ class SpotifyQueueManager:
             if not track:
                 continue
             
-            artists = track.get("artists", [])
-            artist_str = ", ".join(a.get("name", "") for a in artists[:2]) if artists else ""
-            album = track.get("album", {})
+            tg = track.get
+            artists = tg("artists", [])
+            artist_str = _artists_str(artists)
+            album = tg("album", {})
             images = album.get("images", [])
             
             t = TrackItem(
-                track_id=track.get("uri", ""),
+                track_id=tg("uri", ""),
                 source="spotify",
-                name=track.get("name", ""),
+                name=tg("name", ""),
                 artist=artist_str,
                 album=album.get("name", ""),
-                duration_sec=track.get("duration_ms", 0) // 1000,
+                duration_sec=tg("duration_ms", 0) // 1000,
                 image_url=images[-1].get("url") if images else None
             )
             tracks.append(t)
@@ -713,4 +967,4 @@ def get_queue_manager() -> SpotifyQueueManager:
 
 def get_all_required_scopes() -> str:
     """Get all required scopes as a space-separated string."""
-    return " ".join(SpotifyQueueManager.REQUIRED_SCOPES + SpotifyQueueManager.OPTIONAL_SCOPES)
+    return SpotifyQueueManager.ALL_SCOPES_STR
@@ -0,0 +1,25 @@
+import os
+import sys
+import types
+
+# main.py refuses to start without Spotify credentials and would open a serial port
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("REDIRECT_URI", "http://localhost:8080/callback")
+os.environ.setdefault("DISABLE_AUTO_SERIAL", "1")
+os.environ.setdefault("SERIAL_DEBUG", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# control_media drives Windows media keys through pythoncom/pycaw; main only needs its names
+if "control_media" not in sys.modules:
+    try:
+        import control_media  # noqa: F401
+    except ImportError:
+        _cm = types.ModuleType("control_media")
+        for _name in ("spotifyPlay", "spotifyPause", "spotifyNext", "spotifyPrevious",
+                      "media_play_pause", "media_next", "media_previous", "get_spotify_progress",
+                      "is_app_playing", "authorized_req", "save_tokens"):
+            setattr(_cm, _name, lambda *args, **kwargs: None)
+        _cm.load_tokens = lambda *args, **kwargs: {}
+        sys.modules["control_media"] = _cm
@@ -0,0 +1,108 @@
+import types
+
+import pytest
+
+import main
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeQueueManager:
+    def __init__(self):
+        self.liked = False
+        self.checks = 0
+
+    def check_saved_tracks(self, track_ids):
+        self.checks += 1
+        return [self.liked]
+
+    def get_current_queue(self, force_refresh=False):
+        return None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(1000.0)
+    monkeypatch.setattr(main.time, "time", clock)
+    monkeypatch.setattr(main, "_media_snapshot_cache", {
+        "spotify": None, "state": None, "yt": -1, "liked": None, "queue": None,
+        "until": 0.0, "art": False, "value": None,
+    })
+    monkeypatch.setattr(main, "_liked_cache", {"uri": None, "value": False, "until": 0.0})
+    monkeypatch.setattr(main, "_last_seen_artwork_url", None)
+    monkeypatch.setattr(main, "_last_seen_artwork_ts", 0)
+    return clock
+
+
+def test_artwork_hold_runs_from_last_memo_hit(monkeypatch, clock):
+    monkeypatch.setattr(main, "_check_spotify_active", lambda: (False, None))
+    monkeypatch.setattr(main, "_media_state", main.MediaState(
+        "Song", "Artist", "", "http://img/a.jpg", "http://img/a.jpg", 10, 200, False, "youtube"))
+    assert main.get_media_snapshot()["has_artwork"] is True
+
+    # Paused: nothing changes for longer than the hold TTL, so every call is a memo hit
+    clock.now += main._ARTWORK_TTL * 3
+    assert main.get_media_snapshot()["has_artwork"] is True
+
+    # Artwork drops out briefly - it must still be held for the TTL
+    clock.now += 0.5
+    monkeypatch.setattr(main, "_media_state", main._media_state._replace(artwork="", artwork_url=None))
+    media = main.get_media_snapshot()
+    assert media["has_artwork"] is True
+    assert media["artwork_url"] == "http://img/a.jpg"
+
+    clock.now += main._ARTWORK_TTL + 1
+    assert main.get_media_snapshot()["has_artwork"] is False
+
+
+def test_liked_and_queue_changes_bypass_memo(monkeypatch, clock):
+    playback = {
+        "is_playing": True,
+        "progress_ms": 5000,
+        "item": {"name": "Song", "uri": "spotify:track:abc", "duration_ms": 200000,
+                 "artists": [{"name": "Artist"}], "album": {"name": "Album", "images": []}},
+    }
+    qmgr = _FakeQueueManager()
+    monkeypatch.setattr(main, "_check_spotify_active", lambda: (True, playback))
+    monkeypatch.setattr(main, "_QMGR", qmgr)
+    monkeypatch.setattr(main, "_cached_queue_for_esp", {"queue": [{"name": "Next"}]})
+
+    media = main.get_media_snapshot()
+    assert media["is_liked"] is False
+    assert media["queue"] == [{"name": "Next"}]
+
+    # Liked from the ESP: the handler invalidates the cached flag
+    qmgr.liked = True
+    main._liked_cache["until"] = 0.0
+    assert main.get_media_snapshot()["is_liked"] is True
+
+    # Queue refetch rebuilt the ESP queue; the Spotify playback dict is unchanged
+    monkeypatch.setattr(main, "_cached_queue_for_esp", {"queue": [{"name": "Other"}]})
+    assert main.get_media_snapshot()["queue"] == [{"name": "Other"}]
+
+    # Unchanged inputs are still served from the memo without another liked check
+    checks = qmgr.checks
+    main.get_media_snapshot()
+    assert qmgr.checks == checks
+
+
+def test_utc_offset_follows_mid_hour_dst_change(monkeypatch):
+    offsets = {"value": 3600}
+    clock = _Clock(1_700_000_000.0 - 1_700_000_000.0 % 3600 + 60)  # one minute past a UTC hour
+    monkeypatch.setattr(main.time, "time", clock)
+    monkeypatch.setattr(main.time, "localtime",
+                        lambda ts=None: types.SimpleNamespace(tm_gmtoff=offsets["value"]))
+    monkeypatch.setattr(main, "_utc_offset_cache", {"minute": None, "value": 0})
+
+    assert main.get_system_snapshot()["utc_offset"] == 3600
+
+    # Transition half way through the same UTC hour
+    offsets["value"] = 7200
+    clock.now += 30 * 60
+    assert main.get_system_snapshot()["utc_offset"] == 7200
@@ -0,0 +1,37 @@
+from spotify_queue import SpotifyQueueManager
+
+
+def _playlist_item(snapshot_id, total, image="https://img/p1.jpg", owner="me"):
+    return {
+        "id": "p1", "name": "Mix", "public": False, "collaborative": False,
+        "owner": {"id": owner}, "snapshot_id": snapshot_id,
+        "tracks": {"total": total}, "images": [{"url": image, "width": 60}],
+    }
+
+
+def test_playlist_refresh_after_removal_takes_fresh_fields(monkeypatch):
+    mgr = SpotifyQueueManager(tokens_path="missing-tokens.json")
+    listing = {"items": [_playlist_item("s1", 10)]}
+    monkeypatch.setattr(mgr, "_api_get", lambda endpoint, params=None: listing)
+    monkeypatch.setattr(mgr, "_api_delete_json",
+                        lambda endpoint, json_body=None, params=None: (True, {"snapshot_id": "s2"}))
+
+    (pl,) = mgr.get_user_playlists(force_refresh=True)
+    pl.thumb_b64 = "thumb"
+
+    # Removal pre-writes the new snapshot_id into the cached entry
+    assert mgr.remove_track_from_playlist("p1", "spotify:track:x") == "s2"
+    assert mgr.get_user_playlists()[0].snapshot_id == "s2"
+
+    listing["items"] = [_playlist_item("s2", 9, owner="someone")]
+    (pl,) = mgr.get_user_playlists(force_refresh=True)
+    assert (pl.snapshot_id, pl.total_tracks) == ("s2", 9)
+    assert pl.owner_id == "someone"
+    assert pl.thumb_b64 == "thumb"
+    assert mgr._playlists_by_id["p1"] is pl
+
+    # New artwork drops the thumbnail made from the old image
+    listing["items"] = [_playlist_item("s2", 9, image="https://img/p1-new.jpg")]
+    (pl,) = mgr.get_user_playlists(force_refresh=True)
+    assert pl.image_url_60 == "https://img/p1-new.jpg"
+    assert pl.thumb_b64 is None
@@ -0,0 +1,27 @@
+import socket
+import time
+
+from transport import TcpServerTransport
+
+
+def test_client_socket_closed_when_setup_fails(monkeypatch):
+    accepted = []
+
+    def failing_tune(client):
+        accepted.append(client)
+        raise OSError("setsockopt failed")
+
+    monkeypatch.setattr(TcpServerTransport, "_tune_client_socket", staticmethod(failing_tune))
+    transport = TcpServerTransport("127.0.0.1", 0)
+    assert transport.start_server()
+    try:
+        port = transport._server_socket.getsockname()[1]
+        with socket.create_connection(("127.0.0.1", port), timeout=2):
+            deadline = time.monotonic() + 2
+            while not accepted and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert accepted
+        assert accepted[0].fileno() == -1
+        assert not transport.is_connected()
+    finally:
+        transport.close()
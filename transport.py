@@ -3,28 +3,96 @@ Transport abstraction for ESP32 communication.
 Supports Serial (USB) and TCP (WiFi) transports.
 """
 
+import json
+import select
 import socket
+import struct
+import itertools
 import threading
 import queue
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Callable
+from collections import namedtuple
+from typing import Optional, Callable, Dict, List
 
 import serial
-from serial import SerialException
+from serial import SerialException, SerialTimeoutException
+
+# orjson is a much faster C encoder and returns bytes directly; stdlib json is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_loads = orjson.loads if HAS_ORJSON else json.loads
+
+
+# MessagePack is an optional, more compact wire format for snapshots
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# Binary frames can contain '\n', so they are length-prefixed: MSGPACK_MAGIC + uint16 LE length + body
+MSGPACK_MAGIC = b"MP"
+
+# Longest line accepted from the ESP; commands are tiny, so anything bigger is garbage
+# (or a peer that never sends '\n') and must not grow the receive buffer without bound
+MAX_LINE = 64 * 1024
+
+# TCP_CORK exists on Linux only
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+
+# A queued outgoing message; metadata is None unless the caller passed some
+SendItem = namedtuple("SendItem", "payload metadata")
+
+
+def encode_line(obj) -> bytes:
+    """Encode an object as one compact, newline-terminated JSON line."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def encode_frame(obj, wire_format: str = "json") -> bytes:
+    """Encode an object for the ESP in the given wire format ("json" or "msgpack").
+    Falls back to a JSON line if msgpack isn't installed or the body is too large to frame.
+    """
+    if wire_format == "msgpack" and HAS_MSGPACK:
+        body = msgpack.packb(obj, use_bin_type=True)
+        if len(body) <= 0xFFFF:
+            return MSGPACK_MAGIC + struct.pack("<H", len(body)) + body
+    return encode_line(obj)
 
 
 class Transport(ABC):
     """Abstract base class for ESP32 transport."""
     
+    # Set by TransportManager; called whenever the transport connects or disconnects
+    on_state_change: Optional[Callable[[], None]] = None
+    
+    def _state_changed(self) -> None:
+        if self.on_state_change is not None:
+            self.on_state_change()
+    
     @abstractmethod
     def send_line(self, data: bytes) -> bool:
         """Send data to ESP32. Returns True on success."""
         raise NotImplementedError
     
+    def send_many(self, buffers: List[bytes], bulk: bool = False) -> bool:
+        """Send several lines back to back. Returns True if all were sent.
+        `bulk` marks a large transfer (artwork) that may be packed into full packets."""
+        ok = True
+        for data in buffers:
+            ok = self.send_line(data) and ok
+        return ok
+    
     @abstractmethod
-    def recv_line(self, timeout: float = 0.1) -> Optional[str]:
-        """Receive a line from ESP32. Returns None if no data."""
+    def recv_line(self, timeout: float = 0.1) -> Optional[bytes]:
+        """Receive a line from ESP32 as raw (undecoded, stripped) bytes. Returns None if no data."""
         raise NotImplementedError
     
     @abstractmethod
@@ -32,6 +100,14 @@ class Transport(ABC):
         """Check if transport is connected."""
         raise NotImplementedError
     
+    def fileno(self) -> Optional[int]:
+        """OS handle to wait on with select(), or None if this transport must be polled."""
+        return None
+    
+    def has_buffered_line(self) -> bool:
+        """True if a complete line is already buffered (select() won't report it)."""
+        return False
+    
     @abstractmethod
     def close(self) -> None:
         """Close the transport."""
@@ -47,12 +123,18 @@ class Transport(ABC):
 class SerialTransport(Transport):
     """Serial (USB) transport for ESP32."""
     
-    def __init__(self, port: str, baud: int = 115200, timeout: float = 1.0):
+    def __init__(self, port: str, baud: int = 115200, timeout: float = 1.0,
+                 write_timeout: Optional[float] = None):
         self.port = port
         self.baud = baud
         self.timeout = timeout
+        self.write_timeout = write_timeout
         self._serial: Optional[serial.Serial] = None
+        # _lock only guards swapping the handle; I/O holds the per-direction lock, so
+        # the reader thread sitting in readline() never blocks the writer thread
         self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
     
     def connect(self) -> bool:
         """Open the serial port."""
@@ -60,45 +142,89 @@ class SerialTransport(Transport):
             with self._lock:
                 if self._serial is not None:
                     self._serial.close()
-                self._serial = serial.Serial(self.port, self.baud, timeout=self.timeout)
+                self._serial = serial.Serial(self.port, self.baud, timeout=self.timeout,
+                                             write_timeout=self.write_timeout)
                 print(f"[SerialTransport] Connected to {self.port} at {self.baud}")
-                return True
         except SerialException as e:
             print(f"[SerialTransport] Failed to open {self.port}: {e}")
             return False
+        self._state_changed()
+        return True
     
-    def send_line(self, data: bytes) -> bool:
+    def _drop(self, ser: serial.Serial) -> None:
+        """Forget a handle whose device went away (unless it was already replaced)."""
         with self._lock:
-            if self._serial is None:
-                return False
-            try:
-                self._serial.write(data)
-                return True
-            except Exception as e:
-                print(f"[SerialTransport] Write error: {e}")
-                return False
+            if self._serial is not ser:
+                return
+            self._serial = None
+        try:
+            ser.close()
+        except Exception:
+            pass
+        self._state_changed()
     
-    def recv_line(self, timeout: float = 0.1) -> Optional[str]:
-        with self._lock:
-            if self._serial is None:
-                return None
-            try:
-                if self._serial.in_waiting:
-                    line = self._serial.readline().decode("utf-8", errors="ignore").strip()
-                    return line if line else None
-            except Exception as e:
-                print(f"[SerialTransport] Read error: {e}")
+    def send_line(self, data: bytes) -> bool:
+        ser = self._serial
+        if ser is None:
+            return False
+        try:
+            with self._write_lock:
+                ser.write(data)
+            return True
+        except SerialTimeoutException:
+            # Host buffer is backed up; drop this line rather than stall the writer
+            print(f"[SerialTransport] Write timed out, dropped {len(data)} bytes")
+            return False
+        except SerialException as e:
+            print(f"[SerialTransport] Write error: {e}")
+            self._drop(ser)
+            return False
+        except Exception as e:
+            print(f"[SerialTransport] Write error: {e}")
+            return False
+    
+    def send_many(self, buffers: List[bytes], bulk: bool = False) -> bool:
+        # One write (one USB transfer) for the whole batch; nothing to merge for one item
+        return self.send_line(buffers[0] if len(buffers) == 1 else b"".join(buffers))
+    
+    def recv_line(self, timeout: float = 0.1) -> Optional[bytes]:
+        ser = self._serial
+        if ser is None:
+            return None
+        try:
+            with self._read_lock:
+                if not ser.in_waiting:
+                    return None
+                raw = ser.readline(MAX_LINE)
+            line = raw.strip()
+            return line if line else None
+        except SerialException as e:
+            print(f"[SerialTransport] Read error: {e}")
+            self._drop(ser)
+        except Exception as e:
+            print(f"[SerialTransport] Read error: {e}")
         return None
     
     def is_connected(self) -> bool:
-        with self._lock:
-            return self._serial is not None and self._serial.is_open
+        ser = self._serial
+        return ser is not None and ser.is_open
+    
+    def fileno(self) -> Optional[int]:
+        # POSIX only: on Windows pyserial has no fd and select() only takes sockets
+        ser = self._serial
+        if ser is None:
+            return None
+        try:
+            return ser.fileno()
+        except (OSError, ValueError):  # io.UnsupportedOperation from RawIOBase
+            return None
     
     def close(self) -> None:
         with self._lock:
-            if self._serial:
-                self._serial.close()
-                self._serial = None
+            ser, self._serial = self._serial, None
+        if ser:
+            ser.close()
+            self._state_changed()
     
     @property
     def name(self) -> str:
@@ -107,9 +233,12 @@ class SerialTransport(Transport):
     @property
     def in_waiting(self) -> int:
         """Check bytes waiting (for compatibility)."""
-        with self._lock:
-            if self._serial:
-                return self._serial.in_waiting
+        ser = self._serial
+        if ser:
+            try:
+                return ser.in_waiting
+            except SerialException:
+                self._drop(ser)
         return 0
 
 
@@ -125,7 +254,11 @@ class TcpServerTransport(Transport):
         self._lock = threading.Lock()
         self._running = False
         self._accept_thread: Optional[threading.Thread] = None
-        self._recv_buffer = ""
+        # Raw bytes; only a completed line is decoded
+        self._recv_buffer = bytearray()
+        # recv_into() target, reused so each read doesn't allocate a fresh bytes object
+        self._rx_scratch = bytearray(4096)
+        self._rx_view = memoryview(self._rx_scratch)
     
     def start_server(self) -> bool:
         """Start the TCP server and wait for connections."""
@@ -157,12 +290,20 @@ class TcpServerTransport(Transport):
                     continue
                 
                 client, addr = self._server_socket.accept()
+                try:
+                    self._tune_client_socket(client)
+                    client.settimeout(0.1)
+                except OSError as e:
+                    # Peer may already be gone - don't leak the half-set-up socket
+                    print(f"[TcpServerTransport] Client setup failed for {addr}: {e}")
+                    client.close()
+                    continue
                 with self._lock:
                     self._client_socket = client
-                    self._client_socket.settimeout(0.1)
                     self._client_addr = addr
-                    self._recv_buffer = ""
+                    self._recv_buffer.clear()
                 print(f"[TcpServerTransport] ESP32 connected from {addr}")
+                self._state_changed()
                 
             except socket.timeout:
                 continue
@@ -171,6 +312,23 @@ class TcpServerTransport(Transport):
                     print(f"[TcpServerTransport] Accept error: {e}")
                 time.sleep(1)
     
+    @staticmethod
+    def _tune_client_socket(client: socket.socket) -> None:
+        """Low-latency options for the ESP link: no Nagle delay on small frames, room for
+        artwork bursts, and keepalive so a vanished ESP32 is noticed within a minute."""
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Platform-specific extras (Linux has all of these; Windows only some)
+        for opt, value in (("TCP_QUICKACK", 1), ("TCP_KEEPIDLE", 30),
+                           ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+            if hasattr(socket, opt):
+                try:
+                    client.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), value)
+                except OSError:
+                    pass
+    
     def send_line(self, data: bytes) -> bool:
         with self._lock:
             if self._client_socket is None:
@@ -183,25 +341,61 @@ class TcpServerTransport(Transport):
                 self._disconnect_client()
                 return False
     
-    def recv_line(self, timeout: float = 0.1) -> Optional[str]:
+    def send_many(self, buffers: List[bytes], bulk: bool = False) -> bool:
+        with self._lock:
+            sock = self._client_socket
+            if sock is None:
+                return False
+            # Linux: cork bulk sends so the kernel emits full-MSS packets even though
+            # TCP_NODELAY is on; uncorking flushes the tail immediately
+            cork = bulk and _TCP_CORK is not None
+            try:
+                if cork:
+                    sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1)
+                if hasattr(socket.socket, "sendmsg"):
+                    # Scatter write: the whole batch in one syscall (no sendmsg on Windows)
+                    sent = sock.sendmsg(buffers)
+                    # Finish a short send from views into the original buffers, so a
+                    # large artwork frame isn't copied again by a join
+                    for buf in buffers:
+                        if sent >= len(buf):
+                            sent -= len(buf)
+                            continue
+                        sock.sendall(memoryview(buf)[sent:])
+                        sent = 0
+                elif len(buffers) == 1:
+                    sock.sendall(buffers[0])
+                else:
+                    sock.sendall(b"".join(buffers))
+                if cork:
+                    sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 0)
+                return True
+            except Exception as e:
+                print(f"[TcpServerTransport] Send error: {e}")
+                self._disconnect_client()
+                return False
+    
+    def recv_line(self, timeout: float = 0.1) -> Optional[bytes]:
         with self._lock:
             if self._client_socket is None:
                 return None
             try:
                 # Check for complete line in buffer
-                if '\n' in self._recv_buffer:
-                    line, self._recv_buffer = self._recv_buffer.split('\n', 1)
-                    return line.strip()
+                line = self._pop_line()
+                if line is not None:
+                    return line
                 
                 # Try to receive more data
                 try:
-                    data = self._client_socket.recv(4096)
-                    if data:
-                        self._recv_buffer += data.decode("utf-8", errors="ignore")
+                    n = self._client_socket.recv_into(self._rx_view, 4096)
+                    if n:
+                        self._recv_buffer += self._rx_view[:n]
                         # Check again for complete line
-                        if '\n' in self._recv_buffer:
-                            line, self._recv_buffer = self._recv_buffer.split('\n', 1)
-                            return line.strip()
+                        line = self._pop_line()
+                        if line is None and len(self._recv_buffer) > MAX_LINE:
+                            print("[TcpServerTransport] Line too long, dropping connection")
+                            self._disconnect_client()
+                        return line
                     else:
                         # Connection closed
                         print("[TcpServerTransport] Client disconnected (recv returned empty)")
@@ -213,6 +407,15 @@ class TcpServerTransport(Transport):
                 self._disconnect_client()
         return None
     
+    def _pop_line(self) -> Optional[bytes]:
+        """Take one complete line off the receive buffer (must be called with lock held)."""
+        idx = self._recv_buffer.find(b"\n")
+        if idx < 0:
+            return None
+        line = bytes(self._recv_buffer[:idx]).strip()
+        del self._recv_buffer[:idx + 1]
+        return line
+    
     def _disconnect_client(self):
         """Disconnect current client (must be called with lock held)."""
         if self._client_socket:
@@ -222,12 +425,21 @@ class TcpServerTransport(Transport):
                 pass
             self._client_socket = None
             self._client_addr = None
-            self._recv_buffer = ""
+            self._recv_buffer.clear()
             print("[TcpServerTransport] Client disconnected, waiting for reconnect...")
+            self._state_changed()
     
     def is_connected(self) -> bool:
-        with self._lock:
-            return self._client_socket is not None
+        # No lock: a single attribute read is atomic, and this runs from
+        # _state_changed() while _lock is held
+        return self._client_socket is not None
+    
+    def fileno(self) -> Optional[int]:
+        sock = self._client_socket
+        return sock.fileno() if sock is not None else None
+    
+    def has_buffered_line(self) -> bool:
+        return b"\n" in self._recv_buffer
     
     def close(self) -> None:
         self._running = False
@@ -235,6 +447,7 @@ class TcpServerTransport(Transport):
             if self._client_socket:
                 self._client_socket.close()
                 self._client_socket = None
+                self._state_changed()
             if self._server_socket:
                 self._server_socket.close()
                 self._server_socket = None
@@ -251,25 +464,38 @@ class TransportManager:
     Can run both Serial and TCP simultaneously.
     """
     
+    SEND_BATCH_MAX = 9  # items the writer coalesces into one send
+    
     def __init__(self, debug: bool = True):
         self.debug = debug
+        self.wire_format = "json"  # format for dict payloads: "json" or "msgpack"
         self._transports: list[Transport] = []
+        # Recomputed only when a transport connects/disconnects (see _on_transport_state_change)
         self._active_transport: Optional[Transport] = None
-        self._send_queue = queue.Queue()
-        self._priority_queue = queue.Queue(maxsize=2)
+        self._any_connected = threading.Event()  # set while _active_transport is not None
+        # Reader dispatch tables, rebuilt on connect/disconnect and swapped whole:
+        # fd -> connected transport, plus connected transports with no fd (Windows serial)
+        self._fd_to_transport: Dict[int, Transport] = {}
+        self._unselectable: List[Transport] = []
+        # One queue for both lanes, ordered by (lane, seq): lane 0 (artwork etc.)
+        # always goes first, FIFO within a lane
+        # (no task_done()/join(): nothing waits for the queue to drain)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lane_counts = [0, 0]  # items waiting per lane, for the drop policy
+        self._lane_limits = (2, 8)
         self._running = False
         self._writer_thread: Optional[threading.Thread] = None
         self._reader_thread: Optional[threading.Thread] = None
         self._command_callback: Optional[Callable[[dict], None]] = None
         self._lock = threading.Lock()
     
-    def add_serial(self, port: str, baud: int = 115200) -> Optional[SerialTransport]:
+    def add_serial(self, port: str, baud: int = 115200,
+                   write_timeout: Optional[float] = None) -> Optional[SerialTransport]:
         """Add a serial transport."""
-        transport = SerialTransport(port, baud)
+        transport = SerialTransport(port, baud, write_timeout=write_timeout)
         if transport.connect():
-            self._transports.append(transport)
-            if self._active_transport is None:
-                self._active_transport = transport
+            self._attach(transport)
             return transport
         return None
     
@@ -277,27 +503,61 @@ class TransportManager:
         """Add a TCP server transport."""
         transport = TcpServerTransport(host, port)
         if transport.start_server():
-            self._transports.append(transport)
             # TCP becomes active when it has a connected client
+            self._attach(transport)
             return transport
         return None
     
+    def _attach(self, transport: Transport) -> None:
+        self._transports.append(transport)
+        transport.on_state_change = self._on_transport_state_change
+        self._on_transport_state_change()
+    
+    def _on_transport_state_change(self) -> None:
+        with self._lock:
+            self._active_transport = self._pick_active_transport()
+            if self._active_transport is None:
+                self._any_connected.clear()
+            else:
+                self._any_connected.set()
+            fd_map, unselectable = {}, []
+            for t in self._transports:
+                if not t.is_connected():
+                    continue
+                fd = t.fileno()
+                if fd is None:
+                    unselectable.append(t)
+                else:
+                    fd_map[fd] = t
+            self._fd_to_transport = fd_map
+            self._unselectable = unselectable
+    
     def set_command_callback(self, callback: Callable[[dict], None]):
         """Set callback for received commands from ESP32."""
         self._command_callback = callback
     
-    def queue_send(self, data: bytes, priority: bool = False, metadata: dict = None):
-        """Queue data to be sent to ESP32."""
-        item = {"payload": data, "metadata": metadata or {}}
-        if priority:
-            try:
-                self._priority_queue.put_nowait(item)
-            except queue.Full:
-                pass  # Drop if priority queue is full
-        else:
-            # Limit queue size
-            if self._send_queue.qsize() < 8:
-                self._send_queue.put(item)
+    def queue_send(self, data, priority: bool = False, metadata: dict = None):
+        """Queue data to be sent to ESP32.
+
+        `data` is either a dict, which the writer thread encodes (orjson, straight to
+        bytes) so the caller doesn't pay for serialization, or an already-encoded
+        bytes-like object (bytes, bytearray, memoryview) that is sent as-is - never
+        pass `json.dumps(...).encode()` output when a dict would do.
+        """
+        item = SendItem(data, metadata)
+        lane = 0 if priority else 1
+        with self._lock:
+            if self._lane_counts[lane] >= self._lane_limits[lane]:
+                return  # Drop when that lane is already full
+            self._lane_counts[lane] += 1
+        self._queue.put_nowait((lane, next(self._seq), item))
+    
+    def _next_item(self, timeout: float):
+        """Block for the next queued item (priority lane first); raises queue.Empty."""
+        lane, _, item = self._queue.get(timeout=timeout)
+        with self._lock:
+            self._lane_counts[lane] -= 1
+        return item
     
     def start(self):
         """Start writer and reader threads."""
@@ -312,11 +572,19 @@ class TransportManager:
         """Stop all threads and close transports."""
         self._running = False
         for t in self._transports:
+            t.on_state_change = None
             t.close()
         self._transports.clear()
+        self._active_transport = None
+        self._fd_to_transport = {}
+        self._unselectable = []
+        self._any_connected.set()  # wake the writer so it sees _running is False
     
     def _get_active_transport(self) -> Optional[Transport]:
         """Get the best active transport (prefer TCP if connected)."""
+        return self._active_transport
+    
+    def _pick_active_transport(self) -> Optional[Transport]:
         # Check for connected TCP transport first
         for t in self._transports:
             if isinstance(t, TcpServerTransport) and t.is_connected():
@@ -327,6 +595,12 @@ class TransportManager:
                 return t
         return None
     
+    def _encode(self, payload) -> bytes:
+        """Encode a queued payload for the wire (dicts are encoded per `wire_format`)."""
+        if isinstance(payload, dict):
+            return encode_frame(payload, self.wire_format)
+        return payload
+    
     def _writer_loop(self):
         """Background thread to send data."""
         last_log_time = 0
@@ -334,35 +608,32 @@ class TransportManager:
             try:
                 transport = self._get_active_transport()
                 if transport is None:
-                    time.sleep(0.1)
+                    # Sleep until a transport connects (the timeout re-checks _running)
+                    self._any_connected.wait(timeout=1.0)
                     continue
                 
-                # Handle priority queue first
+                # Priority items sort first, so one blocking get serves both lanes
                 try:
-                    item = self._priority_queue.get_nowait()
-                    if item and transport.send_line(item["payload"]):
-                        if self.debug:
-                            meta = item.get("metadata", {})
-                            if meta.get("type") == "artwork":
-                                print(f"[TransportManager] Sent artwork via {transport.name}")
-                    self._priority_queue.task_done()
-                    continue
-                except queue.Empty:
-                    pass
-                
-                # Handle normal queue
-                try:
-                    item = self._send_queue.get(timeout=0.1)
-                    if item and transport.send_line(item["payload"]):
-                        pass  # Sent successfully
-                    self._send_queue.task_done()
+                    items = [self._next_item(timeout=0.1)]
                 except queue.Empty:
-                    pass
+                    items = []
+                if items:
+                    # Drain whatever else is already waiting and send it in one go
+                    try:
+                        while len(items) < self.SEND_BATCH_MAX:
+                            items.append(self._next_item(timeout=0))
+                    except queue.Empty:
+                        pass
+                    buffers = [self._encode(item.payload) for item in items]
+                    artwork = any(item.metadata and item.metadata.get("type") == "artwork" for item in items)
+                    if transport.send_many(buffers, bulk=artwork):
+                        if self.debug and artwork:
+                            print(f"[TransportManager] Sent artwork via {transport.name}")
                 
                 # Log queue size periodically
                 now = time.time()
                 if self.debug and (now - last_log_time) > 2:
-                    qsize = self._send_queue.qsize()
+                    qsize = sum(self._lane_counts)  # lane counters, no queue mutex
                     if qsize > 0:
                         print(f"[TransportManager] Queue size: {qsize}")
                     last_log_time = now
@@ -372,33 +643,54 @@ class TransportManager:
                     print(f"[TransportManager] Writer error: {e}")
                 time.sleep(0.1)
     
+    def _wait_readable(self, timeout: float) -> List[Transport]:
+        """Return the transports that have input, blocking in select() up to `timeout`.
+        Falls back to a short poll while a transport has no selectable handle."""
+        fd_map = self._fd_to_transport
+        unselectable = self._unselectable
+        buffered = [t for t in fd_map.values() if t.has_buffered_line()]
+        if buffered:
+            return buffered
+        if unselectable:
+            time.sleep(0.01)
+            return unselectable + list(fd_map.values())
+        if not fd_map:
+            time.sleep(timeout)
+            return []
+        readable, _, _ = select.select(list(fd_map), [], [], timeout)
+        return [fd_map[fd] for fd in readable]
+    
     def _reader_loop(self):
         """Background thread to receive commands."""
+        # Hoisted: the loop body runs for every received line
+        loads = _loads
+        wait_readable = self._wait_readable
         while self._running:
             try:
-                # Try to read from all transports
-                for transport in self._transports:
-                    if not transport.is_connected():
-                        continue
-                    
+                debug = self.debug
+                callback = self._command_callback
+                # Sleep in select() until a transport has input; the timeout bounds how
+                # long a newly connected TCP client waits to be added to the set
+                for transport in wait_readable(0.2):
                     line = transport.recv_line()
-                    if line:
-                        # Try to parse as JSON command
+                    if not line:
+                        continue
+                    # Commands are JSON objects, parsed straight from the raw bytes;
+                    # anything else is firmware debug output (only that gets decoded)
+                    cmd = None
+                    if line.startswith(b"{"):
                         try:
-                            import json
-                            cmd = json.loads(line)
-                            if isinstance(cmd, dict):
-                                if self.debug:
-                                    cmd_type = cmd.get("cmd") or cmd.get("type")
-                                    print(f"[TransportManager] Received command: {cmd_type}")
-                                if self._command_callback:
-                                    self._command_callback(cmd)
-                        except:
-                            # Not JSON, just debug output
-                            if self.debug and line:
-                                print(f"[SERIAL IN] {line}")
-                
-                time.sleep(0.01)
+                            cmd = loads(line)
+                        except ValueError:  # also orjson.JSONDecodeError
+                            pass
+                    if isinstance(cmd, dict):
+                        if debug:
+                            cmd_type = cmd.get("cmd") or cmd.get("type")
+                            print(f"[TransportManager] Received command: {cmd_type}")
+                        if callback:
+                            callback(cmd)
+                    elif debug:
+                        print(f"[SERIAL IN] {line.decode('utf-8', errors='ignore')}")
             except Exception as e:
                 if self.debug:
                     print(f"[TransportManager] Reader error: {e}")